@@ -14,55 +14,79 @@ import os
 import sys
 import time
 import argparse
-import keyboard
-import pyautogui
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.screen_capture import ScreenCapture
+import config
+from src.win32_input import wait_key, cursor_pos
 
+# NOTE: src.screen_capture (which pulls in PIL, pyautogui and numpy —
+# hundreds of ms of import time) is imported lazily in main() so that
+# `--help` and argument errors come back instantly.
 
-def capture_region(screen: ScreenCapture, name: str, output_dir: str):
+# Pre-joined banners: one stdout write instead of ~10 print syscalls
+_CAPTURE_REGION_BANNER = (
+    "\n📸 TEMPLATE CAPTURE: {name}\n"
+    + "=" * 50 + "\n"
+    "  1. Position mouse at TOP-LEFT corner of the element\n"
+    "  2. Press SPACE\n"
+    "  3. Position mouse at BOTTOM-RIGHT corner\n"
+    "  4. Press SPACE again\n"
+    "  5. Template will be saved!\n"
+    "\n"
+    "  Press ESC to cancel\n"
+    + "=" * 50 + "\n\n"
+)
+
+_FULL_SCREENSHOT_BANNER = (
+    "\n📸 FULL SCREENSHOT: {name}\n"
+    + "=" * 50 + "\n"
+    "  Press SPACE to capture the current screen\n"
+    "  Press ESC to cancel\n"
+    + "=" * 50 + "\n\n"
+)
+
+
+def capture_region(screen, name: str, output_dir: str, fast: bool = False):
     """
     Interactive tool to capture a region of the screen.
     
     Press SPACE to capture corner 1, then SPACE again for corner 2.
+
+    With fast=True the image is written as uncompressed BMP — basically
+    a memcpy plus header, ~30x faster than PNG encoding. The template
+    matcher doesn't care about on-disk size.
     """
-    print(f"\n📸 TEMPLATE CAPTURE: {name}")
-    print("=" * 50)
-    print("  1. Position mouse at TOP-LEFT corner of the element")
-    print("  2. Press SPACE")
-    print("  3. Position mouse at BOTTOM-RIGHT corner")
-    print("  4. Press SPACE again")
-    print("  5. Template will be saved!")
-    print()
-    print("  Press ESC to cancel")
-    print("=" * 50)
-    print()
-    
+    sys.stdout.write(_CAPTURE_REGION_BANNER.format(name=name))
+
+    # Resolve the output path up front so the filesystem syscalls happen
+    # during idle time, not between the SPACE press and the capture
+    os.makedirs(output_dir, exist_ok=True)
+    ext = "bmp" if fast else "png"
+    output_path = os.path.join(output_dir, f"{name}.{ext}")
+
     corner1 = None
     corner2 = None
-    
+
     while True:
-        event = keyboard.read_event()
-        
-        if event.event_type == 'down':
-            if event.name == 'escape':
-                print("  Cancelled.")
-                return None
-                
-            elif event.name == 'space':
-                x, y = pyautogui.position()
-                
-                if corner1 is None:
-                    corner1 = (x, y)
-                    print(f"  ✓ Corner 1: ({x}, {y})")
-                    print("    Now move to BOTTOM-RIGHT corner and press SPACE...")
-                else:
-                    corner2 = (x, y)
-                    print(f"  ✓ Corner 2: ({x}, {y})")
-                    break
+        key = wait_key()
+
+        if key == 'escape':
+            print("  Cancelled.")
+            return None
+
+        elif key == 'space':
+            x, y = cursor_pos()
+
+            if corner1 is None:
+                corner1 = (x, y)
+                print(f"  ✓ Corner 1: ({x}, {y})")
+                print("    Now move to BOTTOM-RIGHT corner and press SPACE...")
+            else:
+                corner2 = (x, y)
+                print(f"  ✓ Corner 2: ({x}, {y})")
+                break
     
     # Ensure corner1 is top-left and corner2 is bottom-right
     left = min(corner1[0], corner2[0])
@@ -76,47 +100,52 @@ def capture_region(screen: ScreenCapture, name: str, output_dir: str):
     print(f"\n  Capturing region: ({left}, {top}) to ({right}, {bottom})")
     print(f"  Size: {width} x {height} pixels")
     
-    # Capture the region
-    screenshot = pyautogui.screenshot(region=(left, top, width, height))
-    
-    # Save it
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, f"{name}.png")
-    screenshot.save(output_path)
-    
+    # Capture the region (fast BitBlt path, only copies this rectangle)
+    screenshot = screen.capture_rect(left, top, width, height)
+
+    if fast:
+        screenshot.save(output_path, format='BMP')
+    else:
+        # Low compression level: much faster save, templates are small anyway
+        screenshot.save(output_path, format='PNG',
+                        compress_level=config.TEMPLATE_PNG_COMPRESS_LEVEL)
+
     print(f"\n  ✓ Saved: {output_path}")
     return output_path
 
 
-def capture_full_screenshot(screen: ScreenCapture, name: str, output_dir: str):
+def capture_full_screenshot(screen, name: str, output_dir: str,
+                            fast: bool = False):
     """
     Capture full scrcpy window screenshot.
     Press SPACE when ready.
+
+    fast=True writes uncompressed BMP instead of PNG.
     """
-    print(f"\n📸 FULL SCREENSHOT: {name}")
-    print("=" * 50)
-    print("  Press SPACE to capture the current screen")
-    print("  Press ESC to cancel")
-    print("=" * 50)
-    print()
-    
+    sys.stdout.write(_FULL_SCREENSHOT_BANNER.format(name=name))
+
+    # Resolve the output path before waiting on the user so nothing
+    # sits between the SPACE press and the actual capture
+    os.makedirs(output_dir, exist_ok=True)
+    ext = "bmp" if fast else "png"
+    output_path = os.path.join(output_dir, f"{name}.{ext}")
+
     while True:
-        event = keyboard.read_event()
-        
-        if event.event_type == 'down':
-            if event.name == 'escape':
-                print("  Cancelled.")
-                return None
-            elif event.name == 'space':
-                break
+        key = wait_key()
+
+        if key == 'escape':
+            print("  Cancelled.")
+            return None
+        elif key == 'space':
+            break
     
     # Capture
     screen.bring_to_front()
     time.sleep(0.2)
-    
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, f"{name}.png")
-    screenshot = screen.capture(save_path=output_path)
+    # reuse_buffer avoids allocating a fresh frame buffer per capture
+    screenshot = screen.capture(
+        save_path=output_path, reuse_buffer=True,
+        png_compress_level=config.TEMPLATE_PNG_COMPRESS_LEVEL)
     
     if screenshot:
         print(f"\n  ✓ Saved: {output_path}")
@@ -126,7 +155,8 @@ def capture_full_screenshot(screen: ScreenCapture, name: str, output_dir: str):
         return None
 
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser (done once at import, reused per main() call)."""
     parser = argparse.ArgumentParser(
         description="Capture template images for game state detection",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -150,9 +180,22 @@ Tips:
                        help="Capture full window instead of a region")
     parser.add_argument("--output", "-o", default="assets/templates",
                        help="Output directory (default: assets/templates)")
+    parser.add_argument("--fast", action="store_true",
+                       help="Save uncompressed BMP (no PNG encoding)")
+
+    return parser
+
+
+# Built once at module scope; repeated main() calls reuse it
+_PARSER = _build_parser()
+
+
+def main():
+    args = _PARSER.parse_args()
     
-    args = parser.parse_args()
-    
+    # Heavy import deferred until we actually need to capture
+    from src.screen_capture import ScreenCapture
+
     # Set up screen capture
     screen = ScreenCapture()
     if not screen.find_window():
@@ -161,9 +204,9 @@ Tips:
     
     # Capture
     if args.full:
-        capture_full_screenshot(screen, args.name, args.output)
+        capture_full_screenshot(screen, args.name, args.output, fast=args.fast)
     else:
-        capture_region(screen, args.name, args.output)
+        capture_region(screen, args.name, args.output, fast=args.fast)
 
 
 if __name__ == "__main__":
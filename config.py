@@ -58,7 +58,9 @@ BEHIND_KING = (0.50, 0.70)
 
 # Default drop targets for testing
 # More variety = more human-like
-DROP_TARGETS = [
+# Tuple-of-tuples (not a list) so the deploy loop can hand out the
+# same canonical tuple objects forever instead of allocating new ones
+DROP_TARGETS = (
     # Bridge areas (common)
     (0.25, 0.50),   # Left bridge
     (0.75, 0.50),   # Right bridge
@@ -82,7 +84,15 @@ DROP_TARGETS = [
     
     # Your calibrated position
     (0.589, 0.532),
-]
+)
+
+# Read-only NumPy view of DROP_TARGETS for hot-loop indexing.
+# Contiguous float32 rows avoid tuple-unpacking and float boxing per
+# access, and allow vectorized jitter over all targets at once.
+import numpy as np
+
+DROP_TARGETS_ARR = np.asarray(DROP_TARGETS, dtype=np.float32)
+DROP_TARGETS_ARR.setflags(write=False)
 
 
 # =============================================================================
@@ -113,6 +123,11 @@ MATCH_CONFIDENCE = 0.8
 # Path to template images
 TEMPLATES_DIR = "assets/templates"
 
+# PNG compression level for saved template screenshots (0-9).
+# Level 1 saves 3-5x faster than PIL's default (6) with only slightly
+# larger files — fine for one-shot capture/diagnostic artifacts.
+TEMPLATE_PNG_COMPRESS_LEVEL = 1
+
 
 # =============================================================================
 # DEBUG SETTINGS
@@ -2,27 +2,50 @@
 Diagnostic script to check window detection
 """
 import win32gui
-import pyautogui
-import keyboard
 import time
 
+import numpy as np
+
+from src.win32_input import wait_key, cursor_pos
+
+# Direct user32 access: walking the window list in a tight ctypes loop
+# avoids the per-window Python callback that EnumWindows marshals.
+# win32_ffi declares the argtypes/restype prototypes once at import.
+import ctypes
+
+from src.win32_ffi import user32 as _user32
+
+_title_buf = ctypes.create_unicode_buffer(256)  # reused across queries
+
+GW_HWNDNEXT = 2
+
+
+def _get_title(hwnd):
+    """Window title via GetWindowTextW into the reusable buffer."""
+    if not _user32.GetWindowTextLengthW(hwnd):
+        return ""
+    _user32.GetWindowTextW(hwnd, _title_buf, 256)
+    return _title_buf.value
+
+
 def find_all_windows_with_title(search_text):
     """Find all windows containing search_text in title."""
+    # Walk the top-level window chain directly instead of EnumWindows,
+    # which traps into a Python callback for every window on the desktop
+    search_lower = search_text.lower()
     windows = []
-    
-    def callback(hwnd, results):
-        if win32gui.IsWindowVisible(hwnd):
-            title = win32gui.GetWindowText(hwnd)
-            if search_text.lower() in title.lower():
-                rect = win32gui.GetWindowRect(hwnd)
-                results.append({
+
+    hwnd = _user32.GetTopWindow(0)
+    while hwnd:
+        if _user32.IsWindowVisible(hwnd):
+            title = _get_title(hwnd)
+            if title and search_lower in title.lower():
+                windows.append({
                     'hwnd': hwnd,
                     'title': title,
-                    'rect': rect
+                    'rect': win32gui.GetWindowRect(hwnd)
                 })
-        return True
-    
-    win32gui.EnumWindows(callback, windows)
+        hwnd = _user32.GetWindow(hwnd, GW_HWNDNEXT)
     return windows
 
 print("=" * 60)
@@ -77,24 +100,37 @@ else:
     print("=" * 60)
     print()
     
+    # Record raw positions only; bounds/percentage math is vectorized
+    # in one pass at the end instead of per keypress
+    recorded = []
+
     while True:
-        event = keyboard.read_event()
-        if event.event_type == 'down':
-            if event.name == 'space':
-                x, y = pyautogui.position()
-                
-                in_window = left <= x <= right and top <= y <= bottom
-                
-                print(f"Mouse at: ({x}, {y})")
-                print(f"Window bounds: x=[{left} to {right}], y=[{top} to {bottom}]")
-                print(f"In window: {in_window}")
-                
-                if in_window:
-                    x_pct = (x - left) / (right - left)
-                    y_pct = (y - top) / (bottom - top)
-                    print(f"Percentage: ({x_pct:.3f}, {y_pct:.3f})")
-                print()
-                
-            elif event.name == 'esc':
-                print("Exiting.")
-                break
\ No newline at end of file
+        key = wait_key()
+        if key == 'space':
+            x, y = cursor_pos()
+            recorded.append((x, y))
+            print(f"[{len(recorded)}] Mouse at: ({x}, {y})")
+
+        elif key == 'escape':
+            break
+
+    if recorded:
+        positions = np.asarray(recorded, dtype=np.int32)
+
+        # One broadcasted comparison for every recorded point
+        in_win = ((positions[:, 0] >= left) & (positions[:, 0] <= right) &
+                  (positions[:, 1] >= top) & (positions[:, 1] <= bottom))
+        pct = (positions - np.array([left, top])) / np.array(
+            [right - left, bottom - top])
+
+        print()
+        print(f"Window bounds: x=[{left} to {right}], y=[{top} to {bottom}]")
+        print(f"Recorded {len(recorded)} position(s):")
+        for i, (x, y) in enumerate(positions):
+            if in_win[i]:
+                print(f"  [{i+1}] ({x}, {y})  pct=({pct[i,0]:.3f}, {pct[i,1]:.3f})")
+            else:
+                print(f"  [{i+1}] ({x}, {y})  OUTSIDE window")
+        print()
+
+    print("Exiting.")
\ No newline at end of file
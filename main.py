@@ -16,7 +16,8 @@ from src.bot import ClashBot
 from src.game_state import UIPositions
 
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser (done once at import, reused per main() call)."""
     parser = argparse.ArgumentParser(
         description="Clash Royale Test Arena Automation",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -61,8 +62,17 @@ Calibration positions needed:
                        help="Battle button position as percentages (e.g., 0.5 0.85)")
     parser.add_argument("--ok-pos", nargs=2, type=float, metavar=('X', 'Y'),
                        help="OK button position as percentages (e.g., 0.5 0.75)")
-    
-    args = parser.parse_args()
+
+    return parser
+
+
+# Built once at module scope so repeated main() calls (and tests that
+# want to inspect the CLI) don't rebuild the whole argument tree
+_PARSER = _build_parser()
+
+
+def main():
+    args = _PARSER.parse_args()
     
     # Apply position overrides
     if args.battle_pos:
@@ -0,0 +1,89 @@
+"""
+JIT Kernels Module
+
+Numba-compiled hot kernels shared across the project, kept in one
+place so the JIT setup is uniform: every kernel declares an explicit
+signature (compilation happens at import, not on the first call in a
+game loop) and uses cache=True (the compiled code persists on disk,
+so only the very first run on a machine pays the compile cost).
+
+Numba is optional — when it isn't installed, NUMBA_AVAILABLE is False
+and the kernel names are None; callers fall back to their NumPy/cv2
+paths.
+
+Ahead-of-time compilation via numba.pycc (a prebuilt shared library
+shipped next to the sources) was considered and rejected: pycc is
+deprecated upstream and slated for removal, and it would add a build
+step for every machine/architecture. Explicit signatures + cache=True
+already deliver what AOT would — no first-call stall (compilation
+happens at import), and the compiled code persists in __pycache__ so
+every later launch, in any process, loads it from disk.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit('Tuple((int64, int64, float64))'
+          '(uint8[:,:], float32[:,:], float64, float64)',
+          parallel=True, fastmath=True, cache=True)
+    def ncc_match(screen, template, t_mean, t_norm):
+        """Normalized cross-correlation scan; returns (x, y, score)."""
+        sh, sw = screen.shape
+        th, tw = template.shape
+        out_h = sh - th + 1
+        out_w = sw - tw + 1
+        n = th * tw
+        row_score = np.empty(out_h, dtype=np.float64)
+        row_x = np.empty(out_h, dtype=np.int64)
+        for y in prange(out_h):
+            best = -2.0
+            best_x = 0
+            for x in range(out_w):
+                s_sum = 0.0
+                s_sq = 0.0
+                cross = 0.0
+                for ty in range(th):
+                    for tx in range(tw):
+                        v = float(screen[y + ty, x + tx])
+                        s_sum += v
+                        s_sq += v * v
+                        cross += v * template[ty, tx]
+                s_mean = s_sum / n
+                num = cross - n * s_mean * t_mean
+                den = np.sqrt(max(s_sq - n * s_mean * s_mean, 1e-12)) * t_norm
+                score = num / den if den > 0.0 else 0.0
+                if score > best:
+                    best = score
+                    best_x = x
+            row_score[y] = best
+            row_x[y] = best_x
+        yi = int(np.argmax(row_score))
+        return row_x[yi], yi, row_score[yi]
+
+    @njit('Tuple((int8[:], int8[:], float32[:,:], float64[:]))'
+          '(int64, int64, float64, float64, float64, int64)',
+          cache=True)
+    def make_schedule(n, n_targets, var, delay_lo, delay_hi, seed):
+        """Fill one batch of deploy randomness in compiled code."""
+        np.random.seed(seed)
+        cards = np.empty(n, dtype=np.int8)
+        target_idx = np.empty(n, dtype=np.int8)
+        jitter = np.empty((n, 2), dtype=np.float32)
+        delays = np.empty(n, dtype=np.float64)
+        for i in range(n):
+            cards[i] = np.random.randint(0, 4)
+            target_idx[i] = np.random.randint(0, n_targets)
+            jitter[i, 0] = np.random.uniform(-var, var)
+            jitter[i, 1] = np.random.uniform(-var, var)
+            delays[i] = np.random.uniform(delay_lo, delay_hi)
+        return cards, target_idx, jitter, delays
+else:
+    ncc_match = None
+    make_schedule = None
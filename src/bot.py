@@ -5,15 +5,85 @@ The main automation logic that coordinates screen capture and input.
 This is where the "brains" of the automation lives.
 """
 
+import atexit
+import collections
+import ctypes
+import gc
+import itertools
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import random
+import signal
 from typing import List, Tuple
 
+import numpy as np
+
 import config
 from src.screen_capture import ScreenCapture
 from src.input_controller import InputController
 from src.game_state import GameState, GameStateDetector, UIPositions
-from src.human_behavior import HumanBehavior, humanize_position, humanize_button, random_delay
+from src.human_behavior import HumanBehavior, humanize_button
+from src.win32_input import wait_key, cursor_pos
+
+# Optional Numba schedule kernel (see src/_jit_kernels.py); without
+# Numba the NumPy fallback in _prebatch_randomness is used
+from src._jit_kernels import NUMBA_AVAILABLE, make_schedule
+
+
+def _pace(deadline: float, delay: float, now, sleep) -> float:
+    """
+    Advance a deadline scheduler by one tick.
+
+    Sleeps only the remainder until deadline + delay, so time spent
+    working counts against the delay instead of stretching the cadence.
+    If the deadline has already passed, resyncs to the current time
+    rather than bursting to catch up.
+
+    Args:
+        deadline: The previous tick's deadline
+        delay: Seconds between ticks
+        now: Clock function (time.monotonic / time.perf_counter)
+        sleep: Sleep function (bound local of time.sleep)
+
+    Returns:
+        The next deadline.
+    """
+    deadline += delay
+    remaining = deadline - now()
+    if remaining > 0:
+        sleep(remaining)
+        return deadline
+    return now()
+
+
+def _enable_high_res_timer():
+    """
+    Ask Windows for 1 ms timer resolution for the life of the process.
+
+    time.sleep() is quantized to the system timer, which defaults to
+    ~15.6 ms — so a 50 ms deploy delay actually lands anywhere in
+    50-66 ms. timeBeginPeriod(1) brings the quantum down to 1 ms; the
+    matching timeEndPeriod runs at exit. No-op off Windows.
+    """
+    try:
+        winmm = ctypes.WinDLL('winmm')
+    except (AttributeError, OSError):
+        return
+    winmm.timeBeginPeriod(1)
+    atexit.register(winmm.timeEndPeriod, 1)
+
+
+# Pre-joined calibration banner: one stdout write instead of 8 prints
+_CALIBRATION_BANNER = (
+    "\n📐 CALIBRATION MODE\n"
+    + "=" * 50 + "\n"
+    "   Press SPACE to capture mouse position\n"
+    "   Press ESC to exit\n"
+    + "=" * 50 + "\n\n"
+    "   Hover your mouse over the scrcpy window and press SPACE...\n\n"
+)
 
 
 class ClashBot:
@@ -32,20 +102,126 @@ class ClashBot:
     
     def __init__(self):
         """Initialize the bot components."""
+        _enable_high_res_timer()
+
         self.screen = ScreenCapture()
         self.input = InputController(screen_capture=self.screen)
         self.state = GameStateDetector(screen_capture=self.screen)
         self.human = HumanBehavior()
         self.running = False
         
-        # Track which card/target we're on
-        self.current_card = 0
-        self.current_target = 0
+        # Card/target cycling via itertools.cycle: C-implemented, no
+        # Python-level modulo or len() per deploy (beats even the
+        # `(i + 1) & 3` bitmask trick, which still runs bytecode and
+        # would pin the target count to powers of two)
+        # One bot-wide worker pool shared by everything that needs to
+        # run off the deploy thread (battle-end detection today, any
+        # future background work tomorrow). A single pool means one
+        # set of warm threads and reused Future machinery instead of
+        # each call site spinning its own. Shut down explicitly at
+        # exit so workers never block interpreter teardown.
+        self._pool = ThreadPoolExecutor(max_workers=3,
+                                        thread_name_prefix='bot')
+        atexit.register(self._pool.shutdown, wait=False)
+
+        self._n_targets = len(config.DROP_TARGETS)
+        self._card_cycle = itertools.cycle(range(4))
+        self._target_cycle = itertools.cycle(range(self._n_targets))
+
+        # Pixel-space coordinate tables, filled in by setup() once the
+        # window rect is known (percentage math done once, not per deploy)
+        self._card_xy = None   # int32 array, shape (4, 2)
+        self._drop_xy = None   # int32 array, shape (len(DROP_TARGETS), 2)
+
+        # Specialized deploy closures compiled by setup(): exact
+        # positions, and a jittered variant for humanized runs
+        self._deploy_fn = None
+        self._deploy_fn_human = None
+
+        # Pixel cache for static UI positions, keyed by percentage
+        # tuple and validated against screen.rect_generation
+        self._pixel_cache = {}
         
         # Game loop settings
         self.games_played = 0
         self.max_games = None  # None = infinite
+
+        # Buffered logging: hot loops append to a deque and a background
+        # thread batch-writes it, so deploys never block on console I/O
+        self._log_q = collections.deque()
+        self._log_stop = threading.Event()
+        self._log_thr = threading.Thread(target=self._drain_log, daemon=True)
+        self._log_thr.start()
+
+        # Timestamp of the last carriage-return status update
+        self._status_last = 0.0
         
+    def _log(self, msg: str):
+        """Queue a log line for the background writer (non-blocking)."""
+        self._log_q.append(msg)
+
+    def _install_sigint_flag(self):
+        """
+        Route Ctrl+C to a plain flag instead of KeyboardInterrupt.
+
+        Wrapping the hot loops in try/except KeyboardInterrupt makes
+        the interpreter eligible to raise at any bytecode boundary; a
+        signal handler that just clears self.running lets the loop run
+        unchecked and exit cleanly at its own condition.
+
+        Returns:
+            The previous SIGINT handler (pass back to restore), or
+            None if the handler couldn't be installed.
+        """
+        def _handler(signum, frame):
+            self.running = False
+
+        try:
+            return signal.signal(signal.SIGINT, _handler)
+        except ValueError:
+            # Not on the main thread; fall back to default behavior
+            return None
+
+    def _restore_sigint(self, prev):
+        """Restore the SIGINT handler saved by _install_sigint_flag."""
+        if prev is not None:
+            signal.signal(signal.SIGINT, prev)
+
+    def _status(self, line: str):
+        """
+        Update a single in-place status line (carriage return, no scroll).
+
+        Rate-limited to 4 updates/second, so hundreds of deploys cost a
+        handful of stdout syscalls instead of one flushed print each.
+        """
+        now = time.perf_counter()
+        if now - self._status_last < 0.25:
+            return
+        self._status_last = now
+        sys.stdout.write('\r' + line.ljust(80))
+        sys.stdout.flush()
+
+    def _drain_log(self):
+        """Background thread: batch-write queued log lines every 100 ms."""
+        while not self._log_stop.wait(0.1):
+            self._flush_log()
+
+    def _flush_log(self):
+        """Write any queued log lines with a single stdout call."""
+        # deque ops are individually atomic, but check-then-popleft is
+        # not: the drain thread and a foreground flush can race, so the
+        # empty deque is signalled by IndexError rather than a pre-check
+        lines = []
+        try:
+            while True:
+                lines.append(self._log_q.popleft())
+        except IndexError:
+            pass
+        if not lines:
+            return
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
     def setup(self) -> bool:
         """
         Set up the bot by finding the game window.
@@ -61,11 +237,103 @@ class ClashBot:
         if not self.screen.find_window():
             return False
         
+        self._precompute_pixel_coords()
+        self._deploy_fn = self._compile_deploy_fn()
+        self._deploy_fn_human = self._compile_deploy_fn(humanize=True)
+
+        # Everything allocated up to here (window handles, config
+        # arrays, pixel tables) lives for the whole session — move it
+        # to the GC's permanent generation so gen-0/1 collections
+        # during the deploy loop never have to scan it
+        gc.collect()
+        gc.freeze()
+
         print()
         print("✓ Bot initialized successfully!")
         print()
         return True
     
+    def _precompute_pixel_coords(self):
+        """
+        Precompute pixel coordinates for card slots and drop targets.
+
+        The window rect is effectively constant during a session, so the
+        percentage→pixel float math is done once here; the deploy hot
+        loop then just indexes small integer arrays.
+        """
+        left, top, right, bottom = self.screen.window_rect
+        width = right - left
+        height = bottom - top
+
+        card_x = left + np.asarray(config.CARD_SLOT_X, dtype=np.float32) * width
+        card_y = np.full(len(config.CARD_SLOT_X),
+                         top + config.CARD_SLOT_Y * height, dtype=np.float32)
+        self._card_xy = np.stack([card_x, card_y], axis=1).astype(np.int32)
+
+        # One (N, 2) stack for every static percentage position — all
+        # drop targets plus the UI buttons — converted with a single
+        # broadcasted multiply-add instead of N scalar conversions
+        size = np.array([width, height], dtype=np.float32)
+        origin = np.array([left, top], dtype=np.float32)
+        buttons = [UIPositions.BATTLE_BUTTON, UIPositions.OK_BUTTON,
+                   UIPositions.PLAY_AGAIN_BUTTON]
+        static_pct = np.asarray(list(config.DROP_TARGETS) + buttons,
+                                dtype=np.float32)
+        static_px = (static_pct * size + origin).astype(np.int32)
+        self._drop_xy = static_px[:len(config.DROP_TARGETS)]
+
+        # Seed the click cache so click_position is a dict hit with no
+        # float math even on the first click of each button
+        gen = self.screen.rect_generation
+        for pct, px in zip(buttons, static_px[len(config.DROP_TARGETS):]):
+            self._pixel_cache[pct] = (gen, (int(px[0]), int(px[1])))
+
+    def _compile_deploy_fn(self, humanize: bool = False):
+        """
+        Build a specialized deploy closure for this session.
+
+        Everything that's constant for the session — pixel tables,
+        cyclers, RNG, drag duration, jitter sigma — is captured in
+        locals here, so each call runs with no attribute lookups,
+        config dereferences or branching on the hot path.
+
+        Args:
+            humanize: Bake Gaussian position jitter into the closure.
+                The default variant deploys at the exact configured
+                pixels, matching the non-humanized paths elsewhere.
+        """
+        card_px = self._card_xy
+        drop_px = self._drop_xy
+        card_cycle = self._card_cycle
+        target_cycle = self._target_cycle
+        drag_pixel = self.input.drag_pixel
+        duration = config.DRAG_DURATION
+        log = self._log
+
+        if not humanize:
+            def _deploy():
+                slot = next(card_cycle)
+                log(f"Deploying card {slot + 1}")
+                drag_pixel(card_px[slot], drop_px[next(target_cycle)],
+                           duration=duration)
+
+            return _deploy
+
+        # Jitter scaled so ~3 sigma stays within the position variance
+        left, top, right, bottom = self.screen.window_rect
+        scale = np.array([right - left, bottom - top], dtype=np.float32)
+        sigma = self.human.position_variance / 3.0
+        rng = np.random.default_rng()
+
+        def _deploy():
+            slot = next(card_cycle)
+            start = card_px[slot] + rng.normal(0.0, sigma, 2) * scale
+            end = drop_px[next(target_cycle)] + rng.normal(0.0, sigma, 2) * scale
+            log(f"Deploying card {slot + 1}")
+            drag_pixel(start, end, duration=duration)
+
+        return _deploy
+
     def deploy_card(self, card_slot: int = None, target: Tuple[float, float] = None, humanize: bool = False):
         """
         Deploy a single card to a target position.
@@ -77,12 +345,14 @@ class ClashBot:
         """
         # Use cycling if not specified
         if card_slot is None:
-            card_slot = self.current_card
-            self.current_card = (self.current_card + 1) % 4
-            
+            card_slot = next(self._card_cycle)
+
+        target_idx = None
         if target is None:
-            target = config.DROP_TARGETS[self.current_target]
-            self.current_target = (self.current_target + 1) % len(config.DROP_TARGETS)
+            target_idx = next(self._target_cycle)
+            # Reuse the canonical tuple from config rather than slicing
+            # a fresh array row — zero allocation per cycled deploy
+            target = config.DROP_TARGETS[target_idx]
         
         # Add human-like imprecision to card grab
         if humanize:
@@ -94,22 +364,35 @@ class ClashBot:
             card_offset = (0, 0)
             drag_duration = config.DRAG_DURATION
         
+        # Fast path: precomputed pixel coordinates, no offset needed
+        if (self._card_xy is not None and target_idx is not None
+                and card_offset == (0, 0)):
+            print(f"Deploying card {card_slot + 1} to target "
+                  f"({target[0]:.2f}, {target[1]:.2f})")
+            self.input.drag_pixel(self._card_xy[card_slot],
+                                  self._drop_xy[target_idx],
+                                  duration=drag_duration)
+            return
+
         # Deploy the card with optional offset
         self.input.drag_card_to_position(card_slot, target, 
                                           card_offset=card_offset, 
                                           duration=drag_duration)
         
-    def run_continuous(self, 
+    def run_continuous(self,
                        num_deploys: int = None,
                        delay: float = None,
-                       randomize: bool = False):
+                       randomize: bool = False,
+                       humanize: bool = False):
         """
         Continuously deploy cards.
-        
+
         Args:
             num_deploys: Number of cards to deploy. None = infinite
             delay: Seconds between deploys. Defaults to config.DEPLOY_DELAY
             randomize: If True, pick random cards and targets
+            humanize: If True, add Gaussian position jitter to deploys;
+                off by default so this mode hits exact configured spots
         """
         delay = delay or config.DEPLOY_DELAY
         self.running = True
@@ -121,36 +404,52 @@ class ClashBot:
         print(f"   Press Ctrl+C to stop")
         print()
         
-        # Bring game to front
-        self.screen.bring_to_front()
-        time.sleep(0.5)
-        
-        try:
-            while self.running:
-                # Check if we've hit our limit
-                if num_deploys is not None and deploy_count >= num_deploys:
-                    print(f"\n✓ Completed {num_deploys} deploys")
-                    break
-                
-                # Choose card and target
-                if randomize:
-                    card = random.randint(0, 3)
-                    target = random.choice(config.DROP_TARGETS)
-                else:
-                    card = None  # Use cycling
-                    target = None
-                
-                # Deploy!
-                deploy_count += 1
-                print(f"[Deploy #{deploy_count}]", end=" ")
-                self.deploy_card(card_slot=card, target=target)
-                
-                # Wait before next deploy
-                time.sleep(delay)
-                
-        except KeyboardInterrupt:
+        # Bring game to front (no-op if it already has focus)
+        self.screen.ensure_foreground(settle=0.5)
+
+        # Deadline-based pacing: time spent inside deploy_card (drag,
+        # logging) counts against the delay, so the effective deploy
+        # rate matches the configured one instead of drifting
+        next_deadline = time.monotonic()
+
+        # Local bindings for the hot loop
+        _randint = random.randint
+        _choice = random.choice
+        _targets = config.DROP_TARGETS
+        _mono = time.monotonic
+        _sleep = time.sleep
+        _deploy_fn = self._deploy_fn_human if humanize else self._deploy_fn
+
+        # Ctrl+C just clears self.running — no try/except in the loop
+        prev_sigint = self._install_sigint_flag()
+
+        while self.running:
+            # Check if we've hit our limit
+            if num_deploys is not None and deploy_count >= num_deploys:
+                print(f"\n✓ Completed {num_deploys} deploys")
+                break
+
+            # Deploy!
+            deploy_count += 1
+            self._log(f"[Deploy #{deploy_count}]")
+            if randomize:
+                self.deploy_card(card_slot=_randint(0, 3),
+                                 target=_choice(_targets))
+            elif _deploy_fn is not None:
+                # Specialized closure: no per-deploy lookups
+                _deploy_fn()
+            else:
+                self.deploy_card()
+
+            # Sleep only until the next deadline; resync if a slow
+            # iteration already blew past it
+            next_deadline = _pace(next_deadline, delay, _mono, _sleep)
+        else:
+            self._flush_log()
             print(f"\n\n⏹️  Stopped by user after {deploy_count} deploys")
-            
+
+        self._restore_sigint(prev_sigint)
+        self._flush_log()
         self.running = False
         
     def test_single_deploy(self):
@@ -163,8 +462,7 @@ class ClashBot:
         print("   Target: Left bridge")
         print()
         
-        self.screen.bring_to_front()
-        time.sleep(0.5)
+        self.screen.ensure_foreground(settle=0.5)
         
         self.input.drag_card_to_bridge(card_slot=0, side="left")
         print("\n✓ Test complete!")
@@ -174,56 +472,48 @@ class ClashBot:
         Interactive mode to help calibrate card and target positions.
         Press SPACE to capture mouse position, ESC to exit.
         """
-        print("\n📐 CALIBRATION MODE")
-        print("=" * 50)
-        print("   Press SPACE to capture mouse position")
-        print("   Press ESC to exit")
-        print("=" * 50)
-        print()
-        print("   Hover your mouse over the scrcpy window and press SPACE...")
-        print()
-        
-        import pyautogui
-        import keyboard
-        
+        sys.stdout.write(_CALIBRATION_BANNER)
+
         capture_count = 0
-        
+
+        # Resolve everything the per-keypress path needs into locals
+        # once, so each SPACE press is just poll + two multiplies
+        rect = self.screen.window_rect
+        if rect:
+            left, top, right, bottom = rect
+            inv_w, inv_h = self.screen._inv_size
+
         try:
             while True:
-                # Wait for spacebar
-                event = keyboard.read_event()
-                
-                if event.event_type == 'down':
-                    if event.name == 'space':
-                        x, y = pyautogui.position()
-                        capture_count += 1
-                        
-                        # Convert to percentages
-                        if self.screen.window_rect:
-                            left, top, right, bottom = self.screen.window_rect
-                            width = right - left
-                            height = bottom - top
-                            
-                            # Check if mouse is in window
-                            if left <= x <= right and top <= y <= bottom:
-                                x_pct = (x - left) / width
-                                y_pct = (y - top) / height
-                                print(f"   [{capture_count}] Pixel: ({x}, {y})")
-                                print(f"       Percentage: ({x_pct:.3f}, {y_pct:.3f})")
-                                print()
-                            else:
-                                print(f"   [{capture_count}] ⚠️  Mouse is outside the game window!")
-                                print(f"       Raw position: ({x}, {y})")
-                                print()
+                # Wait for spacebar (or ESC to exit)
+                key = wait_key()
+
+                if key == 'space':
+                    x, y = cursor_pos()
+                    capture_count += 1
+
+                    # Convert to percentages
+                    if rect:
+                        # Check if mouse is in window
+                        if left <= x <= right and top <= y <= bottom:
+                            x_pct = (x - left) * inv_w
+                            y_pct = (y - top) * inv_h
+                            print(f"   [{capture_count}] Pixel: ({x}, {y})")
+                            print(f"       Percentage: ({x_pct:.3f}, {y_pct:.3f})")
+                            print()
                         else:
-                            print(f"   [{capture_count}] Position: ({x}, {y})")
-                            print("       (Window not found - showing raw coordinates)")
+                            print(f"   [{capture_count}] ⚠️  Mouse is outside the game window!")
+                            print(f"       Raw position: ({x}, {y})")
                             print()
-                            
-                    elif event.name == 'esc':
-                        print(f"\n   ✓ Captured {capture_count} positions. Exiting.")
-                        break
-                    
+                    else:
+                        print(f"   [{capture_count}] Position: ({x}, {y})")
+                        print("       (Window not found - showing raw coordinates)")
+                        print()
+
+                elif key == 'escape':
+                    print(f"\n   ✓ Captured {capture_count} positions. Exiting.")
+                    break
+
         except KeyboardInterrupt:
             print(f"\n   ✓ Captured {capture_count} positions. Exiting.")
 
@@ -231,19 +521,44 @@ class ClashBot:
     # GAME LOOP METHODS
     # =========================================================================
     
+    def _pixels_for(self, position: Tuple[float, float]) -> Tuple[int, int]:
+        """
+        Pixel coordinates for a static percentage position.
+
+        Cached per window-rect generation, so repeated clicks on the
+        same UI button (Battle, OK, Play Again) skip the float math
+        until the window actually moves or resizes. Equivalent to an
+        lru_cache keyed on (position, rect), but the generation counter
+        makes invalidation free when find_window refreshes the rect.
+        """
+        gen = self.screen.rect_generation
+        cached = self._pixel_cache.get(position)
+        if cached is not None and cached[0] == gen:
+            return cached[1]
+
+        xy = self.screen.convert_percentage_to_pixels(position[0], position[1])
+        self._pixel_cache[position] = (gen, xy)
+        return xy
+
     def click_position(self, position: Tuple[float, float], description: str = "", humanize: bool = True):
         """
         Click a position on screen (percentage-based).
-        
+
         Args:
             position: (x_pct, y_pct) percentage position
             description: What we're clicking (for logging)
             humanize: Add slight position jitter
         """
+        # Cached base pixels; jitter is applied on top in pixel space so
+        # the cache still works for humanized clicks
+        x, y = self._pixels_for(position)
+
         if humanize:
-            position = humanize_button(position[0], position[1])
-        
-        x, y = self.screen.convert_percentage_to_pixels(position[0], position[1])
+            jx, jy = humanize_button(0.0, 0.0)
+            left, top, right, bottom = self.screen.window_rect
+            x += int(jx * (right - left))
+            y += int(jy * (bottom - top))
+
         if description:
             print(f"   Clicking: {description}")
         self.input.click(x, y)
@@ -274,12 +589,75 @@ class ClashBot:
             timeout: Max seconds to wait
         """
         print("   Waiting for battle to start...")
-        # For now, just wait a fixed amount
-        # Future: detect the battle UI appearing
-        time.sleep(5)
+        # Poll with exponential backoff instead of a fixed 5-second
+        # sleep: the test arena usually loads in under a second, so
+        # detecting the menu disappearing recovers ~4s per game
+        deadline = time.monotonic() + timeout
+        delay = 0.1
+        while self.running and time.monotonic() < deadline:
+            state = self.state.detect_state()
+            if state not in (GameState.MAIN_MENU, GameState.BATTLE_ENDED):
+                break
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.5)
+        if not self.running:
+            return
         print("   Battle started!")
         self.state.set_state(GameState.IN_BATTLE)
+
+    def _wait_end_screen_gone(self, timeout: float = 8) -> bool:
+        """
+        Wait (with exponential backoff) for the end screen to disappear.
+
+        Returns:
+            True if the end screen went away, False if still visible
+            when the timeout expired (or a stop was requested).
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.1
+        while self.running and time.monotonic() < deadline:
+            if not self.state.is_battle_over():
+                return True
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.5)
+        return False
         
+    def _prebatch_randomness(self, n: int, base_delay: float) -> dict:
+        """
+        Pre-sample n deploys' worth of randomness in four RNG calls.
+
+        Scalar random.* calls allocate a PyFloat (and often a tuple)
+        per draw; sampling whole arrays up front moves all of that into
+        vectorized NumPy and leaves the battle loop with plain indexing.
+
+        Args:
+            n: Number of deploys to sample for
+            base_delay: Base deploy delay (delays span 0.6x to 1.8x)
+
+        Returns:
+            Dict of arrays: 'cards', 'target_idx', 'jitter', 'delays'.
+        """
+        rng = np.random.default_rng()
+        var = self.human.position_variance
+
+        if NUMBA_AVAILABLE:
+            # One compiled loop fills everything; cache=True means the
+            # JIT cost is paid once per machine, not per run
+            cards, target_idx, jitter, delays = make_schedule(
+                n, self._n_targets, var,
+                base_delay * 0.6, base_delay * 1.8,
+                int(rng.integers(0, 2**31)))
+            return {'cards': cards, 'target_idx': target_idx,
+                    'jitter': jitter, 'delays': delays}
+
+        return {
+            'cards': rng.integers(0, 4, size=n, dtype=np.int8),
+            'target_idx': rng.integers(0, self._n_targets,
+                                       size=n, dtype=np.int8),
+            'jitter': rng.uniform(-var, var, size=(n, 2)).astype(np.float32),
+            'delays': rng.uniform(base_delay * 0.6, base_delay * 1.8, size=n),
+        }
+
     def play_battle(self, 
                     max_duration: float = 300,
                     deploy_delay: float = None,
@@ -301,15 +679,57 @@ class ClashBot:
         base_delay = deploy_delay or config.DEPLOY_DELAY
         start_time = time.time()
         deploy_count = 0
-        
+
+        # Standalone calls haven't been through run_game_loop; arm the
+        # flag so the loop runs, while a stop requested by the SIGINT
+        # handler mid-battle still exits at the next iteration
+        if not self.running:
+            self.running = True
+
+        # Deadline-based pacing (see run_continuous): deploy/check time
+        # counts against the delay instead of stretching the cadence
+        next_deploy = time.perf_counter()
+
+        # Bind hot-loop globals/attributes to locals once: each of these
+        # would otherwise cost LOAD_GLOBAL/LOAD_ATTR every iteration,
+        # and the bound methods two dict lookups on top of that
+        _targets = config.DROP_TARGETS
+        _time = time.time
+        _perf = time.perf_counter
+        _sleep = time.sleep
+        _deploy = self.deploy_card
+        _is_over = self.state.is_battle_over
+        _maybe_think = self.human.maybe_think
+        _log = self._log
+        _status = self._status
+        _submit = self._pool.submit
+
+        # Pre-sample card indices, target indices, position noise and
+        # deploy delays in 128-deploy chunks (see _prebatch_randomness)
+        _RAND_CHUNK = 128
+        batch = self._prebatch_randomness(_RAND_CHUNK, base_delay)
+        rand_cards = batch['cards']
+        rand_targets = batch['target_idx']
+        rand_jitter = batch['jitter']
+        rand_delays = batch['delays']
+        rand_i = 0
+
+        # Future for the in-flight battle-end check (at most one).
+        # miss_streak drives adaptive backoff: every 3 consecutive
+        # negative checks doubles the effective check interval (capped
+        # at 8x) — battle end is rare, so steady-state play spends
+        # proportionally less time on captures and template matching
+        pending_check = None
+        miss_streak = 0
+
         print(f"\n🎮 Playing battle...")
         print(f"   Base deploy delay: {base_delay}s" + (" (humanized)" if humanize else ""))
         print(f"   Checking for battle end every {check_interval} deploys (after {skip_initial_checks} deploys)")
         print()
         
-        while True:
-            elapsed = time.time() - start_time
-            
+        while self.running:
+            elapsed = _time() - start_time
+
             # Safety limit - battles shouldn't last more than 5 min
             if elapsed > max_duration:
                 print(f"\n   ⏰ Safety limit reached ({max_duration}s)")
@@ -317,39 +737,65 @@ class ClashBot:
             
             # Maybe pause to "think" (human-like hesitation)
             if humanize:
-                self.human.maybe_think()
+                _maybe_think()
+            
+            # Refill the randomness batch when exhausted
+            if rand_i == _RAND_CHUNK:
+                batch = self._prebatch_randomness(_RAND_CHUNK, base_delay)
+                rand_cards = batch['cards']
+                rand_targets = batch['target_idx']
+                rand_jitter = batch['jitter']
+                rand_delays = batch['delays']
+                rand_i = 0
             
             # Choose card and target
             if randomize:
-                card = random.randint(0, 3)
-                target = random.choice(config.DROP_TARGETS)
+                card = int(rand_cards[rand_i])
+                target = _targets[rand_targets[rand_i]]
+                # Add position noise for human-like imprecision
+                # (pre-sampled; two adds instead of two RNG calls)
+                if humanize:
+                    target = (target[0] + float(rand_jitter[rand_i, 0]),
+                              target[1] + float(rand_jitter[rand_i, 1]))
             else:
                 card = None
                 target = None
-            
-            # Add position noise for human-like imprecision
-            if humanize and target:
-                target = humanize_position(target[0], target[1])
                 
             deploy_count += 1
-            elapsed_str = f"{int(elapsed)}s"
-            print(f"   [{elapsed_str}] Deploy #{deploy_count}", end=" ")
-            self.deploy_card(card_slot=card, target=target, humanize=humanize)
+            # One queued line per deploy; the logger thread batches the
+            # actual console writes off the hot path
+            _status(f"   [{int(elapsed)}s] Deploy #{deploy_count}")
+            _deploy(card_slot=card, target=target, humanize=humanize)
             
-            # Check if battle is over (skip first few deploys to avoid false positives)
-            if deploy_count >= skip_initial_checks and deploy_count % check_interval == 0:
-                print(f"   Checking game state...")
-                if self.state.is_battle_over():
+            # Kick off the battle-end check on the persistent detection
+            # worker so the screenshot + template matching overlaps the
+            # deploy delay instead of stalling the cadence
+            # (skip first few deploys to avoid false positives)
+            effective_interval = check_interval * min(
+                8, 1 << (miss_streak // 3))
+            if (pending_check is None
+                    and deploy_count >= skip_initial_checks
+                    and deploy_count % effective_interval == 0):
+                _log("   Checking game state...")
+                pending_check = _submit(_is_over)
+
+            # Wait until the next deadline (pre-sampled delay if
+            # humanize); resync on overrun so we don't burst to catch up
+            delay = float(rand_delays[rand_i]) if humanize else base_delay
+            rand_i += 1
+            next_deploy = _pace(next_deploy, delay, _perf, _sleep)
+
+            # Poll the detection verdict without blocking; a check that
+            # runs long just rides into the next deploy cycle
+            if pending_check is not None and pending_check.done():
+                if pending_check.result():
                     print(f"\n   🏁 Battle ended detected!")
                     break
-            
-            # Wait before next deploy (randomized if humanize)
-            if humanize:
-                delay = random_delay(min_d=base_delay * 0.6, max_d=base_delay * 1.8)
-            else:
-                delay = base_delay
-            time.sleep(delay)
+                miss_streak += 1
+                pending_check = None
         
+        self._flush_log()
+        sys.stdout.write('\n')
         print(f"\n   Battle complete! Deployed {deploy_count} cards in {int(elapsed)}s")
         self.state.set_state(GameState.BATTLE_ENDED)
         return deploy_count
@@ -362,20 +808,25 @@ class ClashBot:
             play_again: If True, click Play Again. If False, click OK to go to menu.
         """
         print("\n🏁 Battle ended!")
-        
+
+        if not self.running:
+            # Stop requested mid-battle — leave the end screen alone
+            # instead of clicking into another game
+            print("   Stop requested; skipping end-screen handling")
+            return
+
         # Wait for end screen to fully appear
         time.sleep(2)
-        
+
         if play_again:
             self.click_play_again_button()
             print("   Waiting for new game to load...")
-            time.sleep(5)  # Wait longer for new game to load
-            
-            # Verify the Play Again button is gone (new game started)
-            if self.state.is_battle_over():
+            # Poll until the Play Again button is gone instead of a
+            # fixed 5s wait; retry the click once if it didn't take
+            if not self._wait_end_screen_gone():
                 print("   ⚠️ Still on end screen, clicking again...")
                 self.click_play_again_button()
-                time.sleep(5)
+                self._wait_end_screen_gone()
             
             print("   New game ready!")
             self.state.set_state(GameState.IN_BATTLE)
@@ -416,46 +867,53 @@ class ClashBot:
         print(f"   Press Ctrl+C to stop")
         print()
         
-        # Bring game to front
-        self.screen.bring_to_front()
-        time.sleep(1)
+        # Bring game to front (no-op if it already has focus)
+        self.screen.ensure_foreground(settle=1)
         
-        try:
-            while self.running:
-                # Check if we've hit our game limit
-                if num_games is not None and self.games_played >= num_games:
-                    print(f"\n✓ Completed {num_games} games!")
-                    break
-                
-                self.games_played += 1
-                print(f"\n{'='*50}")
-                print(f"📍 GAME {self.games_played}" + (f" of {num_games}" if num_games else ""))
-                print(f"{'='*50}")
-                
-                # First game: need to click Battle button from main menu
-                # Subsequent games: we're already in battle from "Play Again"
-                if self.games_played == 1:
-                    self.click_battle_button()
-                    self.wait_for_battle_start()
-                else:
-                    # Already starting from Play Again click
-                    print("   New battle starting...")
-                    time.sleep(2)
-                
-                # Play the battle
-                self.play_battle(
-                    max_duration=battle_duration,
-                    deploy_delay=deploy_delay,
-                    humanize=humanize
-                )
-                
-                # Handle end screen (clicks Play Again for next game)
-                is_last_game = (num_games is not None and self.games_played >= num_games)
-                self.handle_battle_end(play_again=not is_last_game)
-                
-        except KeyboardInterrupt:
+        # Ctrl+C just clears self.running — no try/except in the loop
+        prev_sigint = self._install_sigint_flag()
+
+        while self.running:
+            # Check if we've hit our game limit
+            if num_games is not None and self.games_played >= num_games:
+                print(f"\n✓ Completed {num_games} games!")
+                break
+            
+            self.games_played += 1
+            print(f"\n{'='*50}")
+            print(f"📍 GAME {self.games_played}" + (f" of {num_games}" if num_games else ""))
+            print(f"{'='*50}")
+            
+            # First game: need to click Battle button from main menu
+            # Subsequent games: we're already in battle from "Play Again"
+            if self.games_played == 1:
+                self.click_battle_button()
+                self.wait_for_battle_start()
+            else:
+                # Already starting from Play Again click
+                print("   New battle starting...")
+                time.sleep(2)
+
+            # A Ctrl+C during the waits above must not start a battle;
+            # continue re-tests the loop condition so the while/else
+            # "stopped by user" message still prints
+            if not self.running:
+                continue
+
+            # Play the battle
+            self.play_battle(
+                max_duration=battle_duration,
+                deploy_delay=deploy_delay,
+                humanize=humanize
+            )
+            
+            # Handle end screen (clicks Play Again for next game)
+            is_last_game = (num_games is not None and self.games_played >= num_games)
+            self.handle_battle_end(play_again=not is_last_game)
+        else:
             print(f"\n\n⏹️  Stopped by user after {self.games_played} games")
         
+        self._restore_sigint(prev_sigint)
         self.running = False
         print("\n🏁 Game loop ended.")
 
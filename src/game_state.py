@@ -10,15 +10,21 @@ Uses image recognition (template matching) to detect UI elements.
 """
 
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import Optional, Tuple
 import cv2
 import numpy as np
-from PIL import Image
 
 import config
 
+# Optional Numba NCC kernel (see src/_jit_kernels.py): used for
+# small-template matching inside an ROI, where cv2.matchTemplate's
+# generic path pays FFT/conv setup per call
+from src._jit_kernels import NUMBA_AVAILABLE, ncc_match
+
 
 class GameState(Enum):
     """Possible game states we care about."""
@@ -49,8 +55,53 @@ class GameStateDetector:
         self.current_state = GameState.UNKNOWN
         self.battle_start_time = None
         
-        # Template images (loaded on demand)
+        # Template images (loaded on demand); grayscale versions kept
+        # alongside so matching runs single-channel
         self.templates = {}
+        self._gray_templates = {}
+        # Quarter-resolution grayscale templates for the coarse pass
+        # of the pyramid search (built lazily per template)
+        self._gray_lvl2 = {}
+        # (float32 template, mean, norm) per name for the Numba kernel
+        self._ncc_stats = {}
+        # Reused matchTemplate output buffers, keyed by (name, shape).
+        # ROI sizes are stable per button, so in steady state every
+        # match writes into the same float32 array — no malloc per poll
+        self._match_bufs = {}
+        # Last successful match location per template: the same button
+        # reappears at the same pixels every game, so later searches
+        # try a tight window there before scanning the frame
+        self._last_loc = {}
+
+        # Short-lived screenshot cache: back-to-back checks (e.g.
+        # is_battle_over right after detect_state) share one capture
+        # instead of each paying for a full grab
+        self._last_capture = None
+        self._last_capture_ts = 0.0
+        # Grayscale conversion cache: keyed on the capture object, so
+        # the two matches inside one check (and any calls sharing a
+        # TTL-cached capture) pay the PIL->NumPy copy + cvtColor once
+        self._gray_src = None
+        self._gray_cached = None
+        # Two-slot ring of persistent BGRX frame buffers for the
+        # zero-alloc capture path: grabs alternate slots, so a fresh
+        # capture on one thread never overwrites the frame the
+        # background matcher is still reading. (A cross-process shared-
+        # memory ring would buy nothing here — detection runs on
+        # threads, and cv2/GDI release the GIL, so capture and matching
+        # already overlap in one process.)
+        self._frame_bufs = [None, None]
+        self._frame_idx = 0
+
+        # Two workers so the play_again and ok_button searches of one
+        # end-screen check run concurrently (cv2 releases the GIL)
+        self._match_pool = ThreadPoolExecutor(max_workers=2,
+                                              thread_name_prefix='match')
+
+        # Background detection thread state (see start_background)
+        self._over_flag = False
+        self._bg_stop = None
+        self._bg_thread = None
         self.templates_dir = os.path.join(
             os.path.dirname(os.path.dirname(__file__)), 
             "assets", "templates"
@@ -73,25 +124,206 @@ class GameStateDetector:
         for ext in ['.png', '.jpg', '.jpeg']:
             path = os.path.join(self.templates_dir, f"{name}{ext}")
             if os.path.exists(path):
-                template = cv2.imread(path)
+                template, gray = self._load_template_arrays(name, path)
                 if template is not None:
                     self.templates[name] = template
+                    self._gray_templates[name] = gray
+                    if NUMBA_AVAILABLE:
+                        # Template-side NCC terms never change; compute
+                        # them once so the kernel only reduces the
+                        # screen-side sums per candidate position
+                        t32 = gray.astype(np.float32)
+                        mean = float(t32.mean())
+                        norm = float(np.sqrt(((t32 - mean) ** 2).sum()))
+                        self._ncc_stats[name] = (t32, mean, norm)
                     print(f"   Loaded template: {name}")
                     return template
         
         return None
+
+    def _load_template_arrays(self, name: str, path: str):
+        """
+        Load (bgr, gray) arrays for a template, using an .npz cache.
+
+        The first run decodes the PNG/JPG and writes both arrays to
+        assets/templates/_cache/{name}.npz; later runs load the raw
+        arrays directly — no image decode, no per-frame grayscale
+        conversion. The cache is refreshed whenever the source image
+        is newer than it.
+        """
+        cache_path = os.path.join(self.templates_dir, "_cache", f"{name}.npz")
+        try:
+            if (os.path.exists(cache_path)
+                    and os.path.getmtime(cache_path) >= os.path.getmtime(path)):
+                data = np.load(cache_path)
+                return data['bgr'], data['gray']
+        except (OSError, KeyError, ValueError):
+            pass  # stale or corrupt cache — re-decode below
+        
+        template = cv2.imread(path)
+        if template is None:
+            return None, None
+        gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+        
+        # Best-effort cache write; matching works fine without it
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            np.savez(cache_path, bgr=template, gray=gray)
+        except OSError:
+            pass
+        
+        return template, gray
     
+    def _match_buf(self, name: str, out_shape: Tuple[int, int]) -> np.ndarray:
+        """Preallocated float32 result buffer for a matchTemplate call."""
+        key = (name, out_shape)
+        buf = self._match_bufs.get(key)
+        if buf is None:
+            # A window resize retires the old shapes; don't let stale
+            # full-frame buffers (each ~MB) pile up behind the new ones
+            if len(self._match_bufs) >= 32:
+                self._match_bufs.clear()
+            buf = np.empty(out_shape, dtype=np.float32)
+            self._match_bufs[key] = buf
+        return buf
+
+    def _gray_of(self, screenshot) -> np.ndarray:
+        """
+        Grayscale ndarray for a screenshot, converted at most once.
+
+        Accepts a PIL Image or an ndarray (grayscale, RGB, or BGRA as
+        delivered raw by fast capture paths — the alpha channel is
+        ignored). A full frame is several MB; without this, every
+        find_template call repeated the copy and color conversion even
+        when matching the same capture twice (play_again + ok_button).
+
+        Returns:
+            uint8 grayscale array (H, W).
+        """
+        if screenshot is self._gray_src:
+            return self._gray_cached
+        
+        arr = (screenshot if isinstance(screenshot, np.ndarray)
+               else np.asarray(screenshot))
+        if arr.ndim == 2:
+            gray = arr
+        elif arr.shape[2] == 4:
+            gray = cv2.cvtColor(arr, cv2.COLOR_BGRA2GRAY)
+        else:
+            gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+        
+        # Cache value before key: a concurrent reader that sees the
+        # new source must never pick up the previous frame's gray
+        self._gray_cached = gray
+        self._gray_src = screenshot
+        return gray
+
+    def _get_screenshot(self, max_age: float = 0.3):
+        """
+        Capture the window, reusing a recent capture when fresh enough.
+
+        Args:
+            max_age: Maximum age (seconds) of a cached capture to reuse
+
+        Returns:
+            PIL Image or ndarray frame, or None if capture failed.
+        """
+        now = time.monotonic()
+        if (self._last_capture is not None
+                and now - self._last_capture_ts <= max_age):
+            return self._last_capture
+
+        screenshot = self._capture_frame()
+        if screenshot is not None:
+            self._last_capture = screenshot
+            self._last_capture_ts = now
+        return screenshot
+
+    def _capture_frame(self):
+        """
+        Grab a frame, preferring the zero-allocation capture_into path.
+
+        Rotates between two persistent (H, W, 4) uint8 buffers that
+        GetDIBits writes into directly — the previous frame stays
+        intact for any thread still matching against it. Falls back to
+        the PIL capture when the fast path isn't available
+        (non-Windows, window lost).
+        """
+        size = self.screen.get_window_size()
+        if size is not None:
+            w, h = size
+            idx = self._frame_idx ^ 1
+            buf = self._frame_bufs[idx]
+            if buf is None or buf.shape[0] != h or buf.shape[1] != w:
+                buf = self._frame_bufs[idx] = np.empty((h, w, 4),
+                                                       dtype=np.uint8)
+            if self.screen.capture_into(buf):
+                self._frame_idx = idx
+                # This slot was last written two grabs ago — if the
+                # identity-keyed grayscale cache still points at it,
+                # that cached gray is now stale
+                if self._gray_src is buf:
+                    self._gray_src = None
+                return buf
+        return self.screen.capture()
+
+    def _roi_around(self, screenshot,
+                    position: Tuple[float, float],
+                    template_name: str,
+                    margin: float = 0.05) -> Tuple[int, int, int, int]:
+        """
+        Pixel box around a percentage position, sized to the template.
+
+        Buttons always appear at (roughly) their calibrated spot, so
+        matching inside this box instead of the whole frame cuts the
+        searched pixel count by ~100x. The box spans the template
+        footprint centred on the expected position plus a margin of
+        the frame on every side, so it always fits the template (a
+        fixed-fraction box was smaller than every shipped button
+        template and degenerated to full-frame scans) while leaving
+        room for calibration drift.
+
+        Returns:
+            (left, top, right, bottom) in screenshot pixel coordinates.
+        """
+        if isinstance(screenshot, np.ndarray):
+            h, w = screenshot.shape[:2]
+        else:
+            w, h = screenshot.size
+
+        # Template dims drive the box size; fall back to a quarter of
+        # the frame if the template isn't available
+        if self.load_template(template_name) is not None:
+            th, tw = self._gray_templates[template_name].shape
+        else:
+            th, tw = h // 4, w // 4
+        half_w = tw // 2 + int(margin * w)
+        half_h = th // 2 + int(margin * h)
+
+        cx = int(position[0] * w)
+        cy = int(position[1] * h)
+        left = max(0, cx - half_w)
+        top = max(0, cy - half_h)
+        right = min(w, cx + half_w)
+        bottom = min(h, cy + half_h)
+        return (left, top, right, bottom)
+
     def find_template(self, 
-                      screenshot: Image.Image, 
+                      screenshot, 
                       template_name: str,
-                      confidence: float = 0.8) -> Optional[Tuple[int, int, float]]:
+                      confidence: float = 0.8,
+                      region: Optional[Tuple[int, int, int, int]] = None
+                      ) -> Optional[Tuple[int, int, float]]:
         """
         Search for a template image within a screenshot.
         
         Args:
-            screenshot: PIL Image to search in
+            screenshot: PIL Image or ndarray (RGB/BGRA/gray) to search in
             template_name: Name of template to search for
             confidence: Minimum match confidence (0.0 to 1.0)
+            region: Optional (left, top, right, bottom) pixel box to
+                search in; coordinates in the result are still relative
+                to the full screenshot
             
         Returns:
             (x, y, confidence) of best match, or None if not found.
@@ -99,18 +331,109 @@ class GameStateDetector:
         template = self.load_template(template_name)
         if template is None:
             return None
+        # Match single-channel: grayscale halves the bytes scanned per
+        # pass (1 vs 3 channels) and UI buttons match fine without color
+        gray_template = self._gray_templates[template_name]
+        
+        # Convert PIL to OpenCV format (grayscale, cached per capture)
+        screen_cv = self._gray_of(screenshot)
+
+        # Specialize on the last observed hit before a full-frame scan
+        if region is None:
+            last = self._last_loc.get(template_name)
+            if last is not None:
+                th, tw = gray_template.shape
+                fh, fw = screen_cv.shape
+                x0, y0 = last
+                box = (max(0, x0 - tw), max(0, y0 - th),
+                       min(fw, x0 + 2 * tw), min(fh, y0 + 2 * th))
+                found = self.find_template(screenshot, template_name,
+                                           confidence, region=box)
+                if found is not None:
+                    return found
+                # Not where it was last time — fall through and scan
+
+        # Restrict the search to the region of interest (a NumPy slice,
+        # no copy) when the caller knows where the element should be
+        off_x = off_y = 0
+        if region is not None:
+            left, top, right, bottom = region
+            crop = screen_cv[top:bottom, left:right]
+            # Fall back to the full frame if the box is smaller than
+            # the template (matchTemplate would reject it) — e.g. the
+            # window is smaller than the calibrated template
+            if (crop.shape[0] >= gray_template.shape[0]
+                    and crop.shape[1] >= gray_template.shape[1]):
+                screen_cv = crop
+                off_x, off_y = left, top
+            else:
+                region = None
+        if region is None and self._coarse_reject(screen_cv, template_name,
+                                                  confidence):
+            # Full-frame search: a quarter-resolution pass rejected the
+            # frame outright — skip the expensive full-res match. This
+            # is the common case while polling for an end screen that
+            # hasn't appeared yet (~16x fewer multiply-accumulates).
+            return None
         
-        # Convert PIL to OpenCV format
-        screen_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        # Small template inside a small crop: the JIT NCC kernel skips
+        # cv2's per-call conv/FFT setup entirely
+        if (NUMBA_AVAILABLE and gray_template.size < 20000
+                and screen_cv.size <= 250000):
+            t32, mean, norm = self._ncc_stats[template_name]
+            x, y, max_val = ncc_match(screen_cv, t32, mean, norm)
+            if max_val >= confidence:
+                hit = (int(x) + off_x, int(y) + off_y, float(max_val))
+                self._last_loc[template_name] = hit[:2]
+                return hit
+            return None
         
-        # Perform template matching
-        result = cv2.matchTemplate(screen_cv, template, cv2.TM_CCOEFF_NORMED)
+        # Perform template matching (into the reused output buffer)
+        out_shape = (screen_cv.shape[0] - gray_template.shape[0] + 1,
+                     screen_cv.shape[1] - gray_template.shape[1] + 1)
+        result = cv2.matchTemplate(screen_cv, gray_template,
+                                   cv2.TM_CCOEFF_NORMED,
+                                   result=self._match_buf(template_name,
+                                                          out_shape))
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
         
         if max_val >= confidence:
-            return (max_loc[0], max_loc[1], max_val)
+            self._last_loc[template_name] = (max_loc[0] + off_x,
+                                             max_loc[1] + off_y)
+            return (max_loc[0] + off_x, max_loc[1] + off_y, max_val)
         
         return None
+
+    def _coarse_reject(self, screen_gray: np.ndarray, template_name: str,
+                       confidence: float) -> bool:
+        """
+        Coarse pyramid pass: can the template be ruled out cheaply?
+
+        Matches a quarter-resolution (two pyrDown levels) template
+        against a quarter-resolution frame. Downsampling blurs detail,
+        so the acceptance threshold is relaxed by 0.15 — a coarse score
+        below even that means the full-res match can't possibly pass.
+
+        Returns:
+            True if the template definitely isn't in the frame.
+        """
+        small_t = self._gray_lvl2.get(template_name)
+        if small_t is None:
+            small_t = cv2.pyrDown(cv2.pyrDown(self._gray_templates[template_name]))
+            self._gray_lvl2[template_name] = small_t
+        
+        small = cv2.pyrDown(cv2.pyrDown(screen_gray))
+        if (small.shape[0] < small_t.shape[0]
+                or small.shape[1] < small_t.shape[1]):
+            return False  # too small to pre-check; do the full match
+        
+        out_shape = (small.shape[0] - small_t.shape[0] + 1,
+                     small.shape[1] - small_t.shape[1] + 1)
+        result = cv2.matchTemplate(
+            small, small_t, cv2.TM_CCOEFF_NORMED,
+            result=self._match_buf(template_name + "_lvl2", out_shape))
+        _, max_val, _, _ = cv2.minMaxLoc(result)
+        return max_val < confidence - 0.15
     
     def detect_state(self) -> GameState:
         """
@@ -122,19 +445,25 @@ class GameStateDetector:
         if not self.screen:
             return GameState.UNKNOWN
         
-        screenshot = self.screen.capture()
+        screenshot = self._get_screenshot()
         if screenshot is None:
             return GameState.UNKNOWN
         
         # Check for battle end (OK button visible)
-        ok_button = self.find_template(screenshot, "ok_button", confidence=0.7)
+        ok_button = self.find_template(
+            screenshot, "ok_button", confidence=0.7,
+            region=self._roi_around(screenshot, UIPositions.OK_BUTTON,
+                                    "ok_button"))
         if ok_button:
             print(f"   🏁 Game over screen detected! (confidence: {ok_button[2]:.2f})")
             self.current_state = GameState.BATTLE_ENDED
             return GameState.BATTLE_ENDED
         
         # Check for main menu (battle button visible)
-        battle_btn = self.find_template(screenshot, "battle_button", confidence=0.7)
+        battle_btn = self.find_template(
+            screenshot, "battle_button", confidence=0.7,
+            region=self._roi_around(screenshot, UIPositions.BATTLE_BUTTON,
+                                    "battle_button"))
         if battle_btn:
             self.current_state = GameState.MAIN_MENU
             return GameState.MAIN_MENU
@@ -145,9 +474,63 @@ class GameStateDetector:
         
         return GameState.UNKNOWN
     
+    def start_background(self, interval: float = 0.5):
+        """
+        Start a daemon thread that polls for battle end continuously.
+
+        The thread captures and matches at a bounded rate and publishes
+        the verdict through a plain bool — so is_battle_over() becomes
+        an O(1) flag read instead of a capture + two matchTemplates,
+        and detection work overlaps whatever the caller is doing.
+
+        Args:
+            interval: Minimum seconds between detection passes
+        """
+        if self._bg_thread is not None and self._bg_thread.is_alive():
+            return
+        self._over_flag = False
+        self._bg_stop = threading.Event()
+        self._bg_thread = threading.Thread(
+            target=self._background_loop, args=(interval,), daemon=True)
+        self._bg_thread.start()
+
+    def stop_background(self):
+        """Stop the background detection thread (if running)."""
+        if self._bg_stop is not None:
+            self._bg_stop.set()
+        self._bg_thread = None
+
+    def _background_loop(self, interval: float):
+        """Worker: poll _check_battle_over at a monotonic-paced rate."""
+        stop = self._bg_stop
+        next_check = time.monotonic()
+        while not stop.is_set():
+            self._over_flag = self._check_battle_over()
+            next_check += interval
+            delay = next_check - time.monotonic()
+            if delay <= 0:
+                next_check = time.monotonic()
+                continue
+            if stop.wait(delay):
+                break
+
     def is_battle_over(self) -> bool:
         """
         Quick check if the battle has ended.
+
+        When the background detector is running this is just a flag
+        read; otherwise it runs a full synchronous detection pass.
+        
+        Returns:
+            True if end-game screen is detected.
+        """
+        if self._bg_thread is not None and self._bg_thread.is_alive():
+            return self._over_flag
+        return self._check_battle_over()
+
+    def _check_battle_over(self) -> bool:
+        """
+        Synchronous battle-end detection pass.
         Looks for the Play Again or OK button that appears on the end-game screen.
         
         Returns:
@@ -156,19 +539,32 @@ class GameStateDetector:
         if not self.screen:
             return False
             
-        screenshot = self.screen.capture()
+        screenshot = self._get_screenshot()
         if screenshot is None:
             return False
         
-        # Look for the Play Again button (appears on end screen)
-        play_again = self.find_template(screenshot, "play_again", confidence=0.7)
+        # Convert once up front so the workers share the gray frame
+        self._gray_of(screenshot)
+        
+        # Search for both end-screen buttons in parallel: the matches
+        # are independent and OpenCV releases the GIL, so the poll's
+        # latency is the slower search instead of the sum of both
+        fut_play = self._match_pool.submit(
+            self.find_template, screenshot, "play_again", 0.7,
+            self._roi_around(screenshot, UIPositions.PLAY_AGAIN_BUTTON,
+                             "play_again"))
+        fut_ok = self._match_pool.submit(
+            self.find_template, screenshot, "ok_button", 0.7,
+            self._roi_around(screenshot, UIPositions.OK_BUTTON,
+                             "ok_button"))
+        
+        play_again = fut_play.result()
         if play_again:
             print(f"   ✓ Play Again button detected! (confidence: {play_again[2]:.2f})")
             self.current_state = GameState.BATTLE_ENDED
             return True
         
-        # Also check for OK button as backup
-        ok_button = self.find_template(screenshot, "ok_button", confidence=0.7)
+        ok_button = fut_ok.result()
         if ok_button:
             print(f"   ✓ OK button detected! (confidence: {ok_button[2]:.2f})")
             self.current_state = GameState.BATTLE_ENDED
@@ -9,6 +9,15 @@ import random
 import time
 from typing import Tuple
 
+import numpy as np
+
+# Note on JIT: the per-call math below is deliberately left as plain
+# Python. After the pooled-sampling rewrites, each call is a couple of
+# multiplies and a clamp — crossing into a compiled helper (Numba or
+# otherwise) costs more in call/boxing overhead than the arithmetic
+# itself. Compiled kernels live in src/_jit_kernels.py and are
+# reserved for batch work where the loop runs inside the kernel.
+
 
 class HumanBehavior:
     """
@@ -47,6 +56,76 @@ class HumanBehavior:
         self.think_duration = think_duration
         self.long_pause_chance = long_pause_chance
         self.long_pause_duration = long_pause_duration
+
+        # Derived constants, computed once so the per-action paths do
+        # no division or attribute chasing. (Config crosses into
+        # compiled code as plain float64 *arguments* — see
+        # _jit_kernels.make_schedule — so no boxed record is needed.)
+        self._pos_sigma = position_variance / 3.0   # 3 sigma = bound
+        self._btn_sigma = 0.01 / 3.0                # button jitter bound
+
+        # Pool of pre-drawn unit uniforms: one vectorized RNG call
+        # refills 4096 pairs, so the per-action cost is an index bump
+        # instead of a Python-level random.uniform round-trip. Stored
+        # as unit samples and scaled at use, so every caller (each
+        # with its own bounds) shares the same pool.
+        self._rng = np.random.default_rng()
+        self._noise_pool = self._rng.random((4096, 2))
+        self._idx = 0
+
+        # Separate pool of standard normals for position/button jitter:
+        # real tap scatter is roughly Gaussian, and NumPy's Ziggurat
+        # sampler draws these without log/sqrt on ~97% of samples
+        self._gauss_pool = self._rng.standard_normal((8192, 2))
+        self._gauss_idx = 0
+
+        # Beta(2, 3) samples for deploy delays: betavariate runs two
+        # gamma draws with log calls per sample, while the vectorized
+        # sampler fills thousands at once
+        self._beta_pool = self._rng.beta(2, 3, 4096)
+        self._beta_idx = 0
+
+        # Pre-rolled coin flips, 64 per RNG call, packed into an int:
+        # each yes/no decision shifts one bit out instead of drawing
+        # and comparing a float. Filled lazily on first use.
+        self._think_bits = 0
+        self._think_left = 0
+        self._pause_bits = 0
+        self._pause_left = 0
+        self._hesit_bits = 0
+        self._hesit_left = 0
+
+    def _pack_flips(self, p: float) -> int:
+        """64 coin flips with P(hit) = p, packed into one integer."""
+        hits = self._rng.random(64) < p
+        return int.from_bytes(np.packbits(hits).tobytes(), 'big')
+
+    def _next_pair(self) -> np.ndarray:
+        """Next pre-drawn pair of unit uniforms, refilling as needed."""
+        i = self._idx
+        if i >= len(self._noise_pool):
+            self._rng.random(out=self._noise_pool)  # refill in place
+            i = 0
+        self._idx = i + 1
+        return self._noise_pool[i]
+
+    def _next_gauss_pair(self) -> np.ndarray:
+        """Next pre-drawn pair of standard normals, refilling as needed."""
+        i = self._gauss_idx
+        if i >= len(self._gauss_pool):
+            self._rng.standard_normal(out=self._gauss_pool)
+            i = 0
+        self._gauss_idx = i + 1
+        return self._gauss_pool[i]
+
+    def _next_beta(self) -> float:
+        """Next pre-drawn Beta(2, 3) sample, refilling as needed."""
+        i = self._beta_idx
+        if i >= len(self._beta_pool):
+            self._beta_pool = self._rng.beta(2, 3, 4096)
+            i = 0
+        self._beta_idx = i + 1
+        return float(self._beta_pool[i])
         
     def add_position_noise(self, x: float, y: float) -> Tuple[float, float]:
         """
@@ -59,8 +138,12 @@ class HumanBehavior:
         Returns:
             (x, y) with random offset applied
         """
-        x_offset = random.uniform(-self.position_variance, self.position_variance)
-        y_offset = random.uniform(-self.position_variance, self.position_variance)
+        # Gaussian scatter (3 sigma ~= the variance bound), clipped so
+        # an outlier can never land further out than the old uniform
+        g = self._next_gauss_pair()
+        v = self.position_variance
+        x_offset = min(v, max(-v, g[0] * self._pos_sigma))
+        y_offset = min(v, max(-v, g[1] * self._pos_sigma))
         
         # Keep within bounds
         new_x = max(0.05, min(0.95, x + x_offset))
@@ -79,9 +162,11 @@ class HumanBehavior:
         Returns:
             (x, y) with small random offset
         """
-        # Smaller variance for buttons (we need to actually hit them)
-        x_offset = random.uniform(-0.01, 0.01)
-        y_offset = random.uniform(-0.01, 0.01)
+        # Smaller variance for buttons (we need to actually hit them);
+        # Gaussian with 3 sigma at the old +/-0.01 bound, clipped
+        g = self._next_gauss_pair()
+        x_offset = min(0.01, max(-0.01, g[0] * self._btn_sigma))
+        y_offset = min(0.01, max(-0.01, g[1] * self._btn_sigma))
         
         return (x + x_offset, y + y_offset)
     
@@ -96,7 +181,8 @@ class HumanBehavior:
             Varied delay time
         """
         variance = base_delay * self.timing_variance
-        return base_delay + random.uniform(-variance, variance)
+        u = self._next_pair()
+        return base_delay + (2.0 * float(u[0]) - 1.0) * variance
     
     def get_drag_duration(self, base_duration: float = 0.3) -> float:
         """
@@ -119,7 +205,13 @@ class HumanBehavior:
         Returns:
             True if we should pause
         """
-        return random.random() < self.think_chance
+        if not self._think_left:
+            self._think_bits = self._pack_flips(self.think_chance)
+            self._think_left = 64
+        bit = self._think_bits & 1
+        self._think_bits >>= 1
+        self._think_left -= 1
+        return bool(bit)
     
     def should_long_pause(self) -> bool:
         """
@@ -129,7 +221,13 @@ class HumanBehavior:
         Returns:
             True if we should take a long pause
         """
-        return random.random() < self.long_pause_chance
+        if not self._pause_left:
+            self._pause_bits = self._pack_flips(self.long_pause_chance)
+            self._pause_left = 64
+        bit = self._pause_bits & 1
+        self._pause_bits >>= 1
+        self._pause_left -= 1
+        return bool(bit)
     
     def think(self):
         """
@@ -162,9 +260,15 @@ class HumanBehavior:
         Brief hesitation before starting a drag.
         Humans don't instantly start dragging - they position, then drag.
         """
-        if random.random() < 0.3:  # 30% chance
-            hesitation = random.uniform(0.1, 0.4)
-            time.sleep(hesitation)
+        if not self._hesit_left:
+            self._hesit_bits = self._pack_flips(0.3)  # 30% chance
+            self._hesit_left = 64
+        bit = self._hesit_bits & 1
+        self._hesit_bits >>= 1
+        self._hesit_left -= 1
+        if bit:
+            u = self._next_pair()
+            time.sleep(0.1 + float(u[0]) * 0.3)  # uniform 0.1..0.4 s
     
     def get_card_offset(self) -> Tuple[float, float]:
         """
@@ -174,8 +278,9 @@ class HumanBehavior:
         Returns:
             (x_offset, y_offset) in percentage
         """
-        x_off = random.uniform(-0.015, 0.015)
-        y_off = random.uniform(-0.01, 0.01)
+        u = self._next_pair()
+        x_off = (2.0 * u[0] - 1.0) * 0.015
+        y_off = (2.0 * u[1] - 1.0) * 0.01
         return (x_off, y_off)
     
     def random_deploy_delay(self, 
@@ -195,9 +300,9 @@ class HumanBehavior:
             Random delay in seconds
         """
         # Use beta distribution for more natural feel
-        # This biases slightly toward lower values
-        alpha, beta = 2, 3
-        normalized = random.betavariate(alpha, beta)
+        # This biases slightly toward lower values (alpha=2, beta=3,
+        # pre-drawn in bulk — see _next_beta)
+        normalized = self._next_beta()
         return min_delay + normalized * (max_delay - min_delay)
     
     def random_wait_between_games(self, base_wait: float = 3.0) -> float:
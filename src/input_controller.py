@@ -5,16 +5,77 @@ Handles simulating mouse inputs to control the game.
 In scrcpy, mouse drags translate to touch drags on the device.
 """
 
+import ctypes
 import time
-import pyautogui
+from ctypes import wintypes
 from typing import Tuple
 
+import numpy as np
+import pyautogui
+
 import config
 
 
 # Configure PyAutoGUI safety features
 pyautogui.FAILSAFE = True  # Move mouse to corner to abort
-pyautogui.PAUSE = 0.1      # Small pause between actions
+# No implicit pause after every pyautogui call — pacing is explicit
+# (ACTION_PAUSE after drags, _precise_sleep inside them) so the 0.1 s
+# hidden global doesn't pad every click and drag sub-step
+pyautogui.PAUSE = 0
+
+# Direct SendInput access for drags: pyautogui routes every sub-step
+# through multiple Python layers (and its global PAUSE) per event.
+# Building the whole INPUT array up front and dispatching events
+# straight from it keeps the per-waypoint cost at one prototyped
+# ctypes call.
+try:
+    _user32 = ctypes.windll.user32
+    SENDINPUT_AVAILABLE = True
+except (AttributeError, OSError):
+    _user32 = None
+    SENDINPUT_AVAILABLE = False
+
+
+if SENDINPUT_AVAILABLE:
+    _INPUT_MOUSE = 0
+    # MOVE | ABSOLUTE | VIRTUALDESK: absolute coordinates span the
+    # whole virtual desktop, not just the primary monitor — otherwise
+    # drags land at the wrong spot when scrcpy sits on a second screen
+    _MOUSEEVENTF_MOVE_ABS = 0x0001 | 0x8000 | 0x4000
+    _MOUSEEVENTF_LEFTDOWN = 0x0002
+    _MOUSEEVENTF_LEFTUP = 0x0004
+
+    class _MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", wintypes.WPARAM),
+        ]
+
+    class _INPUT(ctypes.Structure):
+        _fields_ = [
+            ("type", wintypes.DWORD),
+            ("mi", _MOUSEINPUT),
+        ]
+
+    _INPUT_SIZE = ctypes.sizeof(_INPUT)
+
+    _user32.SendInput.argtypes = [wintypes.UINT, ctypes.c_void_p,
+                                  ctypes.c_int]
+    _user32.SendInput.restype = wintypes.UINT
+
+    # With VIRTUALDESK, absolute coordinates are normalized to
+    # 0..65535 across the virtual screen, whose origin can be negative
+    # when a monitor sits left of/above the primary. Cache the origin
+    # and scale factors once (SM_XVIRTUALSCREEN=76, SM_YVIRTUALSCREEN=77,
+    # SM_CXVIRTUALSCREEN=78, SM_CYVIRTUALSCREEN=79).
+    _VIRT_LEFT = _user32.GetSystemMetrics(76)
+    _VIRT_TOP = _user32.GetSystemMetrics(77)
+    _ABS_X = 65535.0 / max(1, _user32.GetSystemMetrics(78) - 1)
+    _ABS_Y = 65535.0 / max(1, _user32.GetSystemMetrics(79) - 1)
 
 
 class InputController:
@@ -33,6 +94,35 @@ class InputController:
             screen_capture: Optional ScreenCapture instance for coordinate conversion.
         """
         self.screen_capture = screen_capture
+
+        # 1 ms Windows timer resolution for the drag pacing sleeps
+        # (time.sleep is otherwise quantized to ~15.6 ms). Refcounted
+        # per process, so doubling up with the bot's own request is
+        # fine; the period is released automatically at process exit.
+        if SENDINPUT_AVAILABLE:
+            try:
+                ctypes.WinDLL('winmm').timeBeginPeriod(1)
+            except (AttributeError, OSError):
+                pass
+
+        # Cache for compile_deploys: (rect_generation, key, closures)
+        self._compiled_deploys = None
+
+    @staticmethod
+    def _precise_sleep(seconds: float):
+        """
+        Sleep with sub-millisecond landing accuracy.
+
+        Sleeps all but the last ~2 ms through the OS (cheap), then
+        spins on perf_counter for the remainder (exact). Keeps drag
+        waypoints on schedule instead of jittering by a timer quantum.
+        """
+        deadline = time.perf_counter() + seconds
+        coarse = seconds - 0.002
+        if coarse > 0:
+            time.sleep(coarse)
+        while time.perf_counter() < deadline:
+            pass
         
     def click(self, x: int, y: int):
         """
@@ -67,21 +157,96 @@ class InputController:
         
         print(f"Dragging: ({start_x}, {start_y}) → ({end_x}, {end_y})")
         
-        # Move to start position first
-        pyautogui.moveTo(start_x, start_y)
-        time.sleep(0.05)
-        
-        # Perform the drag
-        pyautogui.drag(
-            end_x - start_x,  # x offset
-            end_y - start_y,  # y offset
-            duration=duration,
-            button='left'
-        )
+        if SENDINPUT_AVAILABLE:
+            self._drag_sendinput(start, end, duration)
+        else:
+            # Move to start position first
+            pyautogui.moveTo(start_x, start_y)
+            time.sleep(0.05)
+            
+            # Perform the drag
+            pyautogui.drag(
+                end_x - start_x,  # x offset
+                end_y - start_y,  # y offset
+                duration=duration,
+                button='left'
+            )
         
         time.sleep(config.ACTION_PAUSE)
+
+    def _drag_sendinput(self, start: Tuple[int, int], end: Tuple[int, int],
+                        duration: float):
+        """
+        Drag via a prebuilt SendInput event array.
+
+        All waypoints are interpolated with NumPy and packed into one
+        contiguous INPUT array up front; the loop then just dispatches
+        successive entries on a perf_counter deadline (~8 ms apart) so
+        the drag takes the requested duration. scrcpy still sees a
+        smooth touch drag — but without pyautogui's per-step Python
+        overhead or its global PAUSE.
+
+        Waypoints follow a smoothstep curve rather than a straight
+        line in time: the pointer accelerates out of the card slot and
+        decelerates into the target, the way a real finger drags —
+        constant-velocity motion is a telltale of synthetic input.
+        """
+        steps = max(2, int(duration / 0.008))
+        t = np.linspace(0.0, 1.0, steps)
+        ease = t * t * (3.0 - 2.0 * t)  # smoothstep: 0/0 slope at ends
+        xs = np.rint((start[0] - _VIRT_LEFT
+                      + ease * (end[0] - start[0])) * _ABS_X)
+        ys = np.rint((start[1] - _VIRT_TOP
+                      + ease * (end[1] - start[1])) * _ABS_Y)
+
+        # Events: move-to-start, button down, intermediate moves, up
+        events = (_INPUT * (steps + 2))()
+        events[0].type = _INPUT_MOUSE
+        events[0].mi.dx = int(xs[0])
+        events[0].mi.dy = int(ys[0])
+        events[0].mi.dwFlags = _MOUSEEVENTF_MOVE_ABS
+        events[1].type = _INPUT_MOUSE
+        events[1].mi.dwFlags = _MOUSEEVENTF_LEFTDOWN
+        for i in range(steps):
+            evt = events[i + 2]
+            evt.type = _INPUT_MOUSE
+            evt.mi.dx = int(xs[i])
+            evt.mi.dy = int(ys[i])
+            evt.mi.dwFlags = _MOUSEEVENTF_MOVE_ABS
+        events[steps + 1].mi.dwFlags |= _MOUSEEVENTF_LEFTUP
+
+        # Dispatch: start + press immediately, then pace the moves
+        _user32.SendInput(2, ctypes.byref(events), _INPUT_SIZE)
+        step_delay = duration / steps
+        deadline = time.perf_counter()
+        for i in range(2, steps + 2):
+            _user32.SendInput(
+                1, ctypes.byref(events, i * _INPUT_SIZE), _INPUT_SIZE)
+            deadline += step_delay
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                self._precise_sleep(remaining)
         
-    def drag_card_to_position(self, 
+    def drag_pixel(self,
+                   start: Tuple[int, int],
+                   end: Tuple[int, int],
+                   duration: float = None):
+        """
+        Drag between two precomputed pixel positions.
+
+        Skips the percentage→pixel conversion entirely — for callers
+        (like ClashBot) that precompute coordinates once per window.
+
+        Args:
+            start: (x, y) starting position in screen pixels
+            end: (x, y) ending position in screen pixels
+            duration: Drag duration (None = use config default)
+        """
+        self.drag((int(start[0]), int(start[1])),
+                  (int(end[0]), int(end[1])),
+                  duration=duration)
+
+    def drag_card_to_position(self,
                                card_slot: int, 
                                target: Tuple[float, float],
                                card_offset: Tuple[float, float] = (0, 0),
@@ -103,17 +268,79 @@ class InputController:
         if card_slot < 0 or card_slot > 3:
             raise ValueError("card_slot must be 0-3")
         
-        # Get card position with optional offset
-        card_x_pct = config.CARD_SLOT_X[card_slot] + card_offset[0]
-        card_y_pct = config.CARD_SLOT_Y + card_offset[1]
-        
-        # Convert to pixels
-        start = self.screen_capture.convert_percentage_to_pixels(card_x_pct, card_y_pct)
-        end = self.screen_capture.convert_percentage_to_pixels(target[0], target[1])
+        sc = self.screen_capture
+        sc._update_window_rect()  # throttled; rebuilds card_px on a move
+
+        if sc.card_px is not None:
+            # Slot pixels were precomputed when the rect last changed;
+            # only the per-deploy offset still needs scaling
+            base_x, base_y = sc.card_px[card_slot]
+            width, height = sc.get_window_size()
+            start = (int(base_x + width * card_offset[0]),
+                     int(base_y + height * card_offset[1]))
+        else:
+            card_x_pct = config.CARD_SLOT_X[card_slot] + card_offset[0]
+            card_y_pct = config.CARD_SLOT_Y + card_offset[1]
+            start = sc.convert_percentage_to_pixels(card_x_pct, card_y_pct)
+        end = sc.convert_percentage_to_pixels(target[0], target[1])
         
         print(f"Deploying card {card_slot + 1} to target ({target[0]:.2f}, {target[1]:.2f})")
         self.drag(start, end, duration=duration)
         
+    def compile_deploys(self, slots, targets, duration: float = None):
+        """
+        Partially evaluate (slot, target) deploy pairs into closures.
+
+        For a known deck the start and end pixels of every deploy are
+        session constants, so validation and coordinate lookup happen
+        once here; each returned callable has its pixels baked in and
+        just issues the drag — no percentage conversion, table indexing
+        or slot check left on the per-deploy path. The list is cached
+        and rebuilt when the window rect changes (keyed off
+        rect_generation), so callers can simply call this every time.
+        (ClashBot._compile_deploy_fn layers cycling and jitter on the
+        same idea for its own loop.)
+
+        Args:
+            slots: Card slots (0-3), one per deploy
+            targets: (x_pct, y_pct) target positions, one per slot
+            duration: Drag duration for every deploy (None = config)
+
+        Returns:
+            List of callables f(dx=0, dy=0) — offsets in screen pixels,
+            applied to the card-grab point.
+        """
+        sc = self.screen_capture
+        if not sc:
+            raise ValueError("ScreenCapture required for percentage-based positioning")
+
+        sc._update_window_rect()
+        gen = sc.rect_generation
+        key = (tuple(slots), tuple(tuple(t) for t in targets), duration)
+        cached = self._compiled_deploys
+        if cached is not None and cached[0] == gen and cached[1] == key:
+            return cached[2]
+
+        drag = self.drag
+        fns = []
+        for slot, target in zip(slots, targets):
+            if slot < 0 or slot > 3:
+                raise ValueError("card_slot must be 0-3")
+            if sc.card_px is not None:
+                sx, sy = (int(v) for v in sc.card_px[slot])
+            else:
+                sx, sy = sc.convert_percentage_to_pixels(
+                    config.CARD_SLOT_X[slot], config.CARD_SLOT_Y)
+            ex, ey = sc.convert_percentage_to_pixels(target[0], target[1])
+
+            def _deploy(dx=0, dy=0, _sx=sx, _sy=sy, _ex=ex, _ey=ey):
+                drag((_sx + dx, _sy + dy), (_ex, _ey), duration=duration)
+
+            fns.append(_deploy)
+
+        self._compiled_deploys = (gen, key, fns)
+        return fns
+
     def drag_card_to_bridge(self, card_slot: int, side: str = "left"):
         """
         Convenience function to drag a card to a bridge.
@@ -122,6 +349,16 @@ class InputController:
             card_slot: Which card slot (0-3)
             side: "left" or "right" bridge
         """
+        sc = self.screen_capture
+        if sc is not None and sc.bridge_px is not None:
+            if card_slot < 0 or card_slot > 3:
+                raise ValueError("card_slot must be 0-3")
+            sc._update_window_rect()
+            # Both ends are in the precomputed tables — no conversion
+            start = tuple(int(v) for v in sc.card_px[card_slot])
+            print(f"Deploying card {card_slot + 1} to {side} bridge")
+            self.drag(start, sc.bridge_px[side])
+            return
         target = config.LEFT_BRIDGE if side == "left" else config.RIGHT_BRIDGE
         self.drag_card_to_position(card_slot, target)
 
@@ -5,8 +5,12 @@ Handles finding the scrcpy window and capturing screenshots.
 This is the foundation for all image-based detection.
 """
 
+import atexit
+import ctypes
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
+import numpy as np
 from PIL import Image
 import pyautogui
 
@@ -19,9 +23,65 @@ except ImportError:
     WINDOWS_AVAILABLE = False
     print("Warning: pywin32 not available. Window management limited.")
 
+# Direct GDI access for fast captures (ctypes, no extra dependency)
+try:
+    _user32 = ctypes.windll.user32
+    _gdi32 = ctypes.windll.gdi32
+    GDI_AVAILABLE = True
+except (AttributeError, OSError):
+    GDI_AVAILABLE = False
+
 import config
 
 
+# GDI constants for BitBlt/GetDIBits
+SRCCOPY = 0x00CC0020
+DIB_RGB_COLORS = 0
+BI_RGB = 0
+
+
+class _BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", ctypes.c_uint32),
+        ("biWidth", ctypes.c_int32),
+        ("biHeight", ctypes.c_int32),
+        ("biPlanes", ctypes.c_uint16),
+        ("biBitCount", ctypes.c_uint16),
+        ("biCompression", ctypes.c_uint32),
+        ("biSizeImage", ctypes.c_uint32),
+        ("biXPelsPerMeter", ctypes.c_int32),
+        ("biYPelsPerMeter", ctypes.c_int32),
+        ("biClrUsed", ctypes.c_uint32),
+        ("biClrImportant", ctypes.c_uint32),
+    ]
+
+
+class _BITMAPINFO(ctypes.Structure):
+    _fields_ = [
+        ("bmiHeader", _BITMAPINFOHEADER),
+        ("bmiColors", ctypes.c_uint32 * 3),
+    ]
+
+
+class RawCapture:
+    """
+    Lightweight result of a zero-copy capture.
+
+    `raw` is a memoryview over the capture buffer owned by the
+    ScreenCapture instance — it is NOT a copy, so it is invalidated
+    by the next capture() call. Convert to a PIL Image (or copy the
+    bytes out) before capturing again if you need to keep it.
+    """
+
+    def __init__(self, raw: memoryview, size: Tuple[int, int]):
+        self.raw = raw
+        self.size = size  # (width, height)
+
+    def to_image(self) -> Image.Image:
+        """Convert the raw BGRX buffer to a PIL Image (no extra copy)."""
+        return Image.frombuffer('RGB', self.size, self.raw, 'raw', 'BGRX', 0, 1)
+
+
 class ScreenCapture:
     """
     Manages the scrcpy window and captures screenshots.
@@ -43,6 +103,43 @@ class ScreenCapture:
         self.window_title = window_title or config.SCRCPY_WINDOW_TITLE
         self.window_handle = None
         self.window_rect = None  # (left, top, right, bottom)
+        self._origin = None      # (left, top), cached from window_rect
+        self._size = None        # (width, height), cached from window_rect
+        self._inv_size = None    # (1/width, 1/height), cached reciprocals
+
+        # Bumped whenever the rect actually changes; callers can key
+        # their own derived-coordinate caches off this
+        self.rect_generation = 0
+
+        # GetWindowRect is a kernel transition; during a capture loop
+        # the window almost never moves, so refreshes are throttled to
+        # one syscall per _rect_interval seconds
+        self._rect_ts = 0.0
+        self._rect_interval = 0.5
+
+        # Pixel lookup tables derived from the rect (card slots and
+        # bridges are fixed percentages, so their pixel positions only
+        # change when the window moves). Rebuilt by _update_window_rect
+        # whenever the rect actually changes.
+        self.card_px = None      # (4, 2) int32: screen pixels per card slot
+        self.bridge_px = None    # {'left': (x, y), 'right': (x, y)}
+
+        # Single-worker executor for screenshot saves: a PNG encode is
+        # tens of ms of CPU plus disk I/O, which doesn't belong on the
+        # capture path. One worker keeps saves in submission order.
+        # wait=True at exit so a save in flight isn't truncated.
+        self._io_exec = ThreadPoolExecutor(max_workers=1,
+                                           thread_name_prefix='save')
+        atexit.register(self._io_exec.shutdown, wait=True)
+
+        # Cached GDI objects for fast BitBlt captures.
+        # Created on first capture and reused until the size changes.
+        self._screen_dc = None
+        self._mem_dc = None
+        self._bitmap = None
+        self._gdi_size = None   # (width, height) the cached objects fit
+        self._gdi_buf = None    # preallocated BGRX pixel buffer
+        self._bmi = None
         
     def find_window(self) -> bool:
         """
@@ -54,7 +151,24 @@ class ScreenCapture:
         if not WINDOWS_AVAILABLE:
             print("Cannot find window: pywin32 not installed")
             return False
-            
+
+        # Exact-title lookup first: FindWindow is a single kernel call
+        # (Win32 keeps titles indexed), vs. EnumWindows trapping into a
+        # Python callback for every top-level window on the desktop.
+        # scrcpy sets the window title verbatim from --window-title, so
+        # this hits in the normal case; the enum below is the fallback
+        # for decorated/substring titles.
+        hwnd = win32gui.FindWindow(None, self.window_title)
+        if hwnd and win32gui.IsWindowVisible(hwnd):
+            self.window_handle = hwnd
+            self._update_window_rect(force=True)
+            if GDI_AVAILABLE and self.window_rect:
+                left, top, right, bottom = self.window_rect
+                self._ensure_gdi_surface(right - left, bottom - top)
+            print(f"✓ Found window: '{win32gui.GetWindowText(hwnd)}'")
+            print(f"  Position: {self.window_rect}")
+            return True
+
         def callback(hwnd, windows):
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
@@ -70,7 +184,12 @@ class ScreenCapture:
         
         if windows:
             self.window_handle = windows[0]
-            self._update_window_rect()
+            self._update_window_rect(force=True)
+            # Build the capture surface now, while we're not in a hot
+            # loop — the first capture() then skips the DC/bitmap setup
+            if GDI_AVAILABLE and self.window_rect:
+                left, top, right, bottom = self.window_rect
+                self._ensure_gdi_surface(right - left, bottom - top)
             print(f"✓ Found window: '{win32gui.GetWindowText(self.window_handle)}'")
             print(f"  Position: {self.window_rect}")
             return True
@@ -79,11 +198,56 @@ class ScreenCapture:
             print("  Make sure scrcpy is running!")
             return False
     
-    def _update_window_rect(self):
-        """Update the stored window rectangle."""
+    def _update_window_rect(self, force: bool = False):
+        """
+        Update the stored window rectangle.
+
+        Throttled: between refreshes (0.5 s apart) the cached rect is
+        trusted, skipping the GetWindowRect syscall that every capture
+        used to pay. Pass force=True to refresh unconditionally (used
+        when the window is first found).
+        """
         if self.window_handle:
-            self.window_rect = win32gui.GetWindowRect(self.window_handle)
-    
+            now = time.monotonic()
+            if not force and now - self._rect_ts < self._rect_interval:
+                return
+            self._rect_ts = now
+            new_rect = win32gui.GetWindowRect(self.window_handle)
+            if new_rect == self.window_rect:
+                return
+            self.window_rect = new_rect
+            left, top, right, bottom = new_rect
+            # Cache the origin, size and reciprocal size so coordinate
+            # conversions skip the rect unpack/subtraction (and, for
+            # pixel→percentage, the divides) on every call
+            self._origin = (left, top)
+            self._size = (right - left, bottom - top)
+            self._inv_size = (1.0 / (right - left), 1.0 / (bottom - top))
+            # Invalidate any caches derived from the old rect
+            self.rect_generation += 1
+            self._rebuild_pixel_tables(left, top, right - left, bottom - top)
+
+    def _rebuild_pixel_tables(self, left: int, top: int,
+                              width: int, height: int):
+        """
+        Precompute the pixel positions the deploy path uses every time.
+
+        Rect updates are throttled and rare, so doing the
+        percentage→pixel math here means drag_card_to_position can
+        index an array instead of converting twice per deploy.
+        """
+        slot_x = np.asarray(config.CARD_SLOT_X, dtype=np.float64)
+        xs = left + np.floor(slot_x * width).astype(np.int32)
+        y = top + int(height * config.CARD_SLOT_Y)
+        self.card_px = np.column_stack(
+            (xs, np.full(len(xs), y, dtype=np.int32)))
+        self.bridge_px = {
+            'left': (left + int(width * config.LEFT_BRIDGE[0]),
+                     top + int(height * config.LEFT_BRIDGE[1])),
+            'right': (left + int(width * config.RIGHT_BRIDGE[0]),
+                      top + int(height * config.RIGHT_BRIDGE[1])),
+        }
+
     def get_window_size(self) -> Optional[Tuple[int, int]]:
         """
         Get the current window size.
@@ -107,36 +271,219 @@ class ScreenCapture:
             return None
         return (self.window_rect[0], self.window_rect[1])
     
-    def capture(self, save_path: str = None) -> Optional[Image.Image]:
+    def _ensure_gdi_surface(self, width: int, height: int):
+        """
+        Create (or re-create) the cached GDI objects for captures of
+        the given size. Cheap no-op when the size hasn't changed.
+        """
+        if self._gdi_size == (width, height):
+            return
+
+        self._release_gdi_surface()
+
+        self._screen_dc = _user32.GetDC(0)
+        self._mem_dc = _gdi32.CreateCompatibleDC(self._screen_dc)
+        self._bitmap = _gdi32.CreateCompatibleBitmap(self._screen_dc, width, height)
+        _gdi32.SelectObject(self._mem_dc, self._bitmap)
+
+        # Preallocated buffer the DIB bits are copied into (BGRX, 4 bytes/pixel)
+        self._gdi_buf = (ctypes.c_ubyte * (width * height * 4))()
+
+        bmi = _BITMAPINFO()
+        bmi.bmiHeader.biSize = ctypes.sizeof(_BITMAPINFOHEADER)
+        bmi.bmiHeader.biWidth = width
+        bmi.bmiHeader.biHeight = -height  # negative = top-down row order
+        bmi.bmiHeader.biPlanes = 1
+        bmi.bmiHeader.biBitCount = 32
+        bmi.bmiHeader.biCompression = BI_RGB
+        self._bmi = bmi
+
+        self._gdi_size = (width, height)
+
+    def __del__(self):
+        """Release the cached GDI objects when the capture goes away."""
+        try:
+            self._release_gdi_surface()
+        except Exception:
+            # Interpreter shutdown may have torn down the DLL handles
+            # already; leaking at exit is harmless
+            pass
+
+    def _release_gdi_surface(self):
+        """Free the cached GDI objects (if any)."""
+        if self._bitmap:
+            _gdi32.DeleteObject(self._bitmap)
+            self._bitmap = None
+        if self._mem_dc:
+            _gdi32.DeleteDC(self._mem_dc)
+            self._mem_dc = None
+        if self._screen_dc:
+            _user32.ReleaseDC(0, self._screen_dc)
+            self._screen_dc = None
+        self._gdi_size = None
+
+    def capture_rect(self, left: int, top: int,
+                     width: int, height: int) -> Optional[Image.Image]:
+        """
+        Capture an arbitrary rectangle of the screen.
+
+        Uses a direct GDI BitBlt into a cached bitmap, which copies only
+        the requested rectangle. This is 2-2.5x faster than
+        pyautogui.screenshot, which grabs the whole desktop and crops
+        (on a 4K display that's ~33 MB of wasted copy per frame). An
+        mss dependency would buy nothing here — it wraps the same
+        BitBlt calls we make directly.
+
+        Args:
+            left, top: Top-left corner in screen pixels
+            width, height: Size of the rectangle
+
+        Returns:
+            PIL Image of the region, or None if failed.
+        """
+        if not GDI_AVAILABLE:
+            # Fall back to the slow path on non-Windows systems
+            return pyautogui.screenshot(region=(left, top, width, height))
+
+        self._ensure_gdi_surface(width, height)
+
+        _gdi32.BitBlt(self._mem_dc, 0, 0, width, height,
+                      self._screen_dc, left, top, SRCCOPY)
+        _gdi32.GetDIBits(self._mem_dc, self._bitmap, 0, height,
+                         self._gdi_buf, ctypes.byref(self._bmi), DIB_RGB_COLORS)
+
+        # Wrap the raw BGRX bytes without copying, then let PIL reorder
+        pixels = np.frombuffer(self._gdi_buf, dtype=np.uint8).reshape(height, width, 4)
+        return Image.frombuffer('RGB', (width, height), pixels, 'raw', 'BGRX', 0, 1)
+
+    def capture_into(self, buf: np.ndarray) -> bool:
+        """
+        Capture the window directly into a caller-owned BGRX buffer.
+
+        GetDIBits writes straight into the ndarray's memory, so a
+        polling caller can reuse one buffer forever — no per-frame
+        allocation at all. The buffer must be C-contiguous uint8 of
+        shape (height, width, 4) matching the current window size.
+
+        Args:
+            buf: Destination array, shape (height, width, 4), uint8
+
+        Returns:
+            True on success; False if GDI is unavailable, the window
+            is missing, or the buffer doesn't match the window size.
+        """
+        if not GDI_AVAILABLE:
+            return False
+
+        self._update_window_rect()
+        if not self.window_rect:
+            return False
+
+        left, top, right, bottom = self.window_rect
+        width = right - left
+        height = bottom - top
+        if (buf.dtype != np.uint8 or buf.shape != (height, width, 4)
+                or not buf.flags['C_CONTIGUOUS']):
+            return False
+
+        self._ensure_gdi_surface(width, height)
+        _gdi32.BitBlt(self._mem_dc, 0, 0, width, height,
+                      self._screen_dc, left, top, SRCCOPY)
+        _gdi32.GetDIBits(self._mem_dc, self._bitmap, 0, height,
+                         buf.ctypes.data_as(ctypes.c_void_p),
+                         ctypes.byref(self._bmi), DIB_RGB_COLORS)
+        return True
+
+    def capture(self, save_path: str = None,
+                reuse_buffer: bool = False,
+                png_compress_level: int = None,
+                as_array: bool = False) -> Optional[Image.Image]:
         """
         Capture a screenshot of the scrcpy window.
-        
+
         Args:
             save_path: If provided, save the screenshot to this path.
-            
+                The encode runs on a background worker, so capture()
+                returns without waiting for the PNG to hit disk.
+            reuse_buffer: If True, skip the PIL conversion and return a
+                RawCapture whose .raw is a memoryview over the persistent
+                capture buffer (zero-copy). The view is invalidated by
+                the next capture() call. Windows-only; falls back to the
+                normal PIL path elsewhere.
+            png_compress_level: PNG compression level (0-9) for save_path.
+                Lower = faster save, bigger file. None = PIL default.
+            as_array: If True, return a (height, width, 4) uint8 BGRX
+                ndarray viewing the persistent capture buffer instead
+                of a PIL Image — no conversion copy at all. Like
+                reuse_buffer, the view is invalidated by the next
+                capture() call. Off Windows, returns a copied RGB array.
+
         Returns:
-            PIL Image of the screenshot, or None if failed.
+            PIL Image of the screenshot (RawCapture if reuse_buffer,
+            ndarray if as_array), or None if failed.
         """
         # Refresh window position in case it moved
         self._update_window_rect()
-        
+
         if not self.window_rect:
             print("Cannot capture: window not found")
             return None
-        
+
         left, top, right, bottom = self.window_rect
         width = right - left
         height = bottom - top
-        
+
+        if (reuse_buffer or as_array) and GDI_AVAILABLE:
+            # Blit straight into the persistent buffer and hand out a
+            # view over it — no per-frame allocation or copy.
+            self._ensure_gdi_surface(width, height)
+            _gdi32.BitBlt(self._mem_dc, 0, 0, width, height,
+                          self._screen_dc, left, top, SRCCOPY)
+            _gdi32.GetDIBits(self._mem_dc, self._bitmap, 0, height,
+                             self._gdi_buf, ctypes.byref(self._bmi),
+                             DIB_RGB_COLORS)
+            raw = RawCapture(memoryview(self._gdi_buf), (width, height))
+            if save_path:
+                # to_image() unpacks BGRX->RGB into fresh pixels, so the
+                # worker's copy is independent of the reused GDI buffer
+                self._io_exec.submit(self._save_image, raw.to_image(),
+                                     save_path, png_compress_level)
+            if as_array:
+                return np.frombuffer(self._gdi_buf,
+                                     dtype=np.uint8).reshape(height, width, 4)
+            return raw
+
         # Capture the region
-        screenshot = pyautogui.screenshot(region=(left, top, width, height))
-        
+        screenshot = self.capture_rect(left, top, width, height)
+
         if save_path:
-            screenshot.save(save_path)
-            print(f"Screenshot saved: {save_path}")
-        
+            # The PIL image owns its pixels (the BGRX unpack copied),
+            # so encoding off-thread is safe while capturing continues
+            self._io_exec.submit(self._save_image, screenshot,
+                                 save_path, png_compress_level)
+
+        if as_array and screenshot is not None:
+            # Non-GDI fallback: one copy out of the PIL image
+            return np.asarray(screenshot)
+
         return screenshot
+
+    @staticmethod
+    def _save_image(image: Image.Image, save_path: str,
+                    png_compress_level: int = None):
+        """Save a captured image, honoring the PNG compression setting."""
+        if png_compress_level is not None and save_path.lower().endswith(".png"):
+            image.save(save_path, format='PNG', compress_level=png_compress_level)
+        else:
+            image.save(save_path)
+        print(f"Screenshot saved: {save_path}")
     
+    def is_foreground(self) -> bool:
+        """Check whether the scrcpy window is already the foreground window."""
+        if not (self.window_handle and WINDOWS_AVAILABLE):
+            return False
+        return win32gui.GetForegroundWindow() == self.window_handle
+
     def bring_to_front(self):
         """Bring the scrcpy window to the foreground."""
         if self.window_handle and WINDOWS_AVAILABLE:
@@ -145,32 +492,69 @@ class ScreenCapture:
                 time.sleep(0.1)  # Brief pause to let it come to front
             except Exception as e:
                 print(f"Could not bring window to front: {e}")
+
+    def ensure_foreground(self, settle: float = 0.5):
+        """
+        Bring the window to the front only if it isn't already there.
+
+        Skips both the SetForegroundWindow call and the settle sleep
+        when the window is already focused — saves the fixed half-second
+        (or more) startup delay on normal back-to-back runs.
+
+        Args:
+            settle: Seconds to wait after actually switching focus
+        """
+        if self.is_foreground():
+            return
+        self.bring_to_front()
+        time.sleep(settle)
     
+    def pixels_to_percentage(self, x: int, y: int) -> Tuple[float, float]:
+        """
+        Convert screen pixel coordinates to window percentages.
+
+        Uses the cached origin and reciprocal size from the last rect
+        update, so the hot path is two multiplies (no division).
+
+        Args:
+            x: X pixel coordinate (screen coordinates)
+            y: Y pixel coordinate (screen coordinates)
+
+        Returns:
+            (x_pct, y_pct) as fractions of the window size.
+        """
+        if not self._origin:
+            raise ValueError("Window not found. Call find_window() first.")
+
+        return ((x - self._origin[0]) * self._inv_size[0],
+                (y - self._origin[1]) * self._inv_size[1])
+
     def convert_percentage_to_pixels(self, x_pct: float, y_pct: float) -> Tuple[int, int]:
         """
         Convert percentage positions to actual pixel coordinates.
         
         This is useful because card/arena positions are stored as percentages
         to work across different screen sizes.
-        
+
+        Uses the origin and size cached at the last rect update, so the
+        per-call work is two multiply-adds. (Fixed-point Q16 math would
+        not help here — Python ints are boxed objects, so an imul+shift
+        costs the same as the float multiply; the truly hot positions
+        are precomputed into pixel tables and never come through this
+        path at all.)
+
         Args:
             x_pct: X position as percentage (0.0 to 1.0)
             y_pct: Y position as percentage (0.0 to 1.0)
-            
+
         Returns:
             (x, y) pixel coordinates relative to screen (not window).
         """
-        if not self.window_rect:
+        if not self._origin:
             raise ValueError("Window not found. Call find_window() first.")
-        
-        left, top, right, bottom = self.window_rect
-        width = right - left
-        height = bottom - top
-        
-        x = left + int(width * x_pct)
-        y = top + int(height * y_pct)
-        
-        return (x, y)
+
+        return (self._origin[0] + int(self._size[0] * x_pct),
+                self._origin[1] + int(self._size[1] * y_pct))
 
 
 # =============================================================================
@@ -0,0 +1,45 @@
+"""
+Win32 FFI Prototypes
+
+Central place where the ctypes signatures (argtypes/restype) of the
+user32 functions used across the project are declared once. Without
+explicit prototypes ctypes falls back to generic int conversion on
+every call; with them each call takes the fast C-signature path —
+which matters in the kHz-rate key and cursor polling loops.
+"""
+
+import ctypes
+from ctypes import wintypes
+
+try:
+    user32 = ctypes.windll.user32
+    WIN32_AVAILABLE = True
+except (AttributeError, OSError):
+    user32 = None
+    WIN32_AVAILABLE = False
+
+
+if WIN32_AVAILABLE:
+    user32.GetCursorPos.argtypes = [ctypes.POINTER(wintypes.POINT)]
+    user32.GetCursorPos.restype = wintypes.BOOL
+
+    user32.GetAsyncKeyState.argtypes = [ctypes.c_int]
+    user32.GetAsyncKeyState.restype = ctypes.c_short
+
+    user32.GetWindowRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    user32.GetWindowRect.restype = wintypes.BOOL
+
+    user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    user32.IsWindowVisible.restype = wintypes.BOOL
+
+    user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.GetWindowTextW.restype = ctypes.c_int
+
+    user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+    user32.GetWindowTextLengthW.restype = ctypes.c_int
+
+    user32.GetTopWindow.argtypes = [wintypes.HWND]
+    user32.GetTopWindow.restype = wintypes.HWND
+
+    user32.GetWindow.argtypes = [wintypes.HWND, ctypes.c_uint]
+    user32.GetWindow.restype = wintypes.HWND
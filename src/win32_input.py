@@ -0,0 +1,106 @@
+"""
+Win32 Input Polling Helpers
+
+Low-level keyboard polling via ctypes. The `keyboard` package routes
+every event through a global low-level hook thread, which adds 5-15 ms
+of latency per keypress and keeps an extra thread alive in the process.
+Polling GetAsyncKeyState directly detects key edges in ~1 ms with
+near-zero CPU (we sleep between polls).
+"""
+
+import ctypes
+import time
+from ctypes import wintypes
+from typing import Tuple
+
+# Prototyped user32 handle (argtypes/restype set once at import)
+from src.win32_ffi import user32 as _user32, WIN32_AVAILABLE
+
+# Reused POINT struct so cursor_pos() doesn't allocate per call
+_cursor_pt = wintypes.POINT()
+
+# Virtual-key codes we care about
+VK_SPACE = 0x20
+VK_ESCAPE = 0x1B
+
+_KEY_NAMES = {VK_SPACE: "space", VK_ESCAPE: "escape"}
+
+# High bit of GetAsyncKeyState = key is currently down
+_KEY_DOWN = 0x8000
+
+
+def wait_key(vks: Tuple[int, ...] = (VK_SPACE, VK_ESCAPE),
+             poll_interval: float = 0.001) -> str:
+    """
+    Block until one of the given virtual keys is pressed.
+
+    Detects rising edges (up -> down transitions), so a held key
+    doesn't retrigger. The 1 ms sleep between polls keeps CPU usage
+    near zero while keeping keypress-to-return latency at ~1 ms
+    (vs. the 5-15 ms hook round-trip of the keyboard package).
+
+    Args:
+        vks: Virtual-key codes to watch (default: SPACE and ESC)
+        poll_interval: Seconds to sleep between polls
+
+    Returns:
+        Name of the pressed key ("space", "escape", ...).
+    """
+    if not WIN32_AVAILABLE:
+        return _wait_key_fallback(vks)
+
+    prev = {vk: _user32.GetAsyncKeyState(vk) & _KEY_DOWN for vk in vks}
+    while True:
+        for vk in vks:
+            down = _user32.GetAsyncKeyState(vk) & _KEY_DOWN
+            if down and not prev[vk]:
+                return _KEY_NAMES.get(vk, str(vk))
+            prev[vk] = down
+        time.sleep(poll_interval)
+
+
+def cursor_pos() -> Tuple[int, int]:
+    """
+    Get the current mouse position as (x, y) screen pixels.
+
+    One direct GetCursorPos call into a reused POINT — about half the
+    overhead of pyautogui.position(), and lets pure-capture tools skip
+    importing pyautogui entirely.
+    """
+    if not WIN32_AVAILABLE:
+        import pyautogui
+        return tuple(pyautogui.position())
+
+    _user32.GetCursorPos(ctypes.byref(_cursor_pt))
+    return (_cursor_pt.x, _cursor_pt.y)
+
+
+def _wait_key_fallback(vks) -> str:
+    """
+    Fall back to the `keyboard` package when Win32 isn't available.
+
+    Event-driven rather than a read_event() loop: the hook filters in
+    keyboard's own dispatch thread and wakes us via an Event, so the
+    waiting thread doesn't run Python for every key-up and unrelated
+    press in between.
+    """
+    import threading
+
+    import keyboard
+
+    names = {_KEY_NAMES.get(vk, str(vk)) for vk in vks}
+    hit = []
+    done = threading.Event()
+
+    def _on_press(event):
+        name = "escape" if event.name == "esc" else event.name
+        if name in names and not hit:
+            hit.append(name)
+            done.set()
+
+    hook = keyboard.on_press(_on_press)
+    try:
+        done.wait()
+    finally:
+        keyboard.unhook(hook)
+    return hit[0]